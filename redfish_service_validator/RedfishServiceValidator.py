@@ -75,6 +75,15 @@ def main(argslist=None, configfile=None):
     argget.add_argument('--uricheck', action="store_true", help='Allow URI checking on services below RedfishVersion 1.6.0')
     argget.add_argument('--schema_directory', type=str, default='./SchemaFiles/metadata', help='Directory for local schema files')
     argget.add_argument('--mockup', type=str, default='', help='Enables insertion of local mockup resources to replace missing, incomplete, or incorrect implementations retrieved from the service that may hinder full validation coverage')
+    argget.add_argument('--expand', action="store_true", help='Request collections with $expand=.($levels=1) when the service supports it, instead of requesting each member')
+    argget.add_argument('--logentry_limit', type=int, default=15, help='Maximum number of LogEntry resources to validate in each log, 0 to validate all of them')
+    argget.add_argument('--page_size', type=int, default=0, help='Number of members to request per page with $skip and $top, for collections that return fewer members than Members@odata.count without a Members@odata.nextLink')
+    argget.add_argument('--workers', type=int, default=1, help='Maximum number of resources to fetch from the service in parallel, adapting to the service latency and errors; results are identical to a serial run')
+    argget.add_argument('--cache_size', type=int, default=256, help='Size in MiB of service responses to keep in memory for reuse during validation')
+    argget.add_argument('--cache_directory', type=str, default='', help='Directory to write cached service responses to once the in-memory cache is full')
+    argget.add_argument('--retries', type=int, default=0, help='Number of times to retry a GET request that fails or returns a transient error status, with exponential backoff')
+    argget.add_argument('--record', type=str, default='', help='Directory to record every response from the service to, for use with --replay')
+    argget.add_argument('--replay', type=str, default='', help='Directory of responses recorded with --record to validate against, without contacting the service')
 
     # parse...
     args = argget.parse_args(argslist)
@@ -212,6 +221,7 @@ def main(argslist=None, configfile=None):
         my_logger.error(line)
 
     finalCounts.update(metadata.get_counter())
+    finalCounts.update(currentService.get_counter())
 
     fails = 0
     for key in [key for key in finalCounts.keys()]:
@@ -232,7 +242,7 @@ def main(argslist=None, configfile=None):
 
     # dump cache info to debug log
     my_logger.debug('getSchemaDetails() -> {}'.format(schema.getSchemaDetails.cache_info()))
-    my_logger.debug('callResourceURI() -> {}'.format(currentService.callResourceURI.cache_info()))
+    my_logger.debug('callResourceURI() -> {}'.format(currentService.cache.cache_info()))
 
     if not success:
         my_logger.error("Validation has failed: {} problems found".format(fails))
@@ -104,6 +104,42 @@ g_config_defaults = {
         "mockup": {
             "value": "",
             "description": "Enables insertion of local mockup resources to replace payloads from the service"
+        },
+        "expand": {
+            "value": "False",
+            "description": "Whether to request collections with $expand when the service supports it"
+        },
+        "logentry_limit": {
+            "value": "15",
+            "description": "Maximum number of LogEntry resources to validate in each log, 0 to validate all of them"
+        },
+        "page_size": {
+            "value": "0",
+            "description": "Number of members to request per page with $skip and $top"
+        },
+        "workers": {
+            "value": "1",
+            "description": "Number of resources to fetch from the service in parallel"
+        },
+        "cache_size": {
+            "value": "256",
+            "description": "Size in MiB of service responses to keep in memory for reuse during validation"
+        },
+        "cache_directory": {
+            "value": "",
+            "description": "Directory to write cached service responses to once the in-memory cache is full"
+        },
+        "retries": {
+            "value": "0",
+            "description": "Number of times to retry a GET request that fails or returns a transient error status"
+        },
+        "record": {
+            "value": "",
+            "description": "Directory to record every response from the service to"
+        },
+        "replay": {
+            "value": "",
+            "description": "Directory of recorded responses to validate against, without contacting the service"
         }
     }
 }
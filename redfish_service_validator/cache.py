@@ -0,0 +1,147 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import redfish as rf
+
+import logging
+my_logger = logging.getLogger(__name__)
+
+
+def getPayloadSize(response):
+    """
+    Get the size of the payload held by a response, in bytes or characters
+
+    :return: integer
+    """
+    if response is None:
+        return 0
+    try:
+        return len(response.read or '')
+    except Exception:
+        return 0
+
+
+class ResponseCache():
+    """
+    Least recently used cache of callResourceURI results, bounded by total payload size
+
+    Entries evicted from memory are written to spill_dir when given, and are read back on the next request
+    """
+    def __init__(self, max_bytes, spill_dir=None):
+        self.max_bytes = max(int(max_bytes), 0)
+        self.spill_dir = spill_dir if spill_dir not in ['', None] else None
+        if self.spill_dir is not None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        self.entries = OrderedDict()
+        self.spilled = set()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.counter = {'hits': 0, 'misses': 0, 'evictions': 0, 'spillWrites': 0, 'spillHits': 0}
+
+    def __contains__(self, key):
+        return key in self.entries or key in self.spilled
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Get a cached result, promoting it to most recently used
+
+        :return: (success, decoded, response, elapsed), or None when not cached
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.counter['hits'] += 1
+                return self.entries[key][0]
+            if key not in self.spilled:
+                self.counter['misses'] += 1
+                return None
+        value = self._readSpill(key)
+        with self.lock:
+            if value is None:
+                self.spilled.discard(key)
+                self.counter['misses'] += 1
+                return None
+            self.counter['spillHits'] += 1
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        """
+        Cache a result, evicting least recently used entries past max_bytes
+
+        :param key: URI of the request
+        :param value: (success, decoded, response, elapsed)
+        """
+        size = getPayloadSize(value[2])
+        evicted = []
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes and self.entries:
+                old_key, (old_value, old_size) = self.entries.popitem(last=False)
+                self.size -= old_size
+                self.counter['evictions'] += 1
+                if self.spill_dir is not None and old_key not in self.spilled:
+                    evicted.append((old_key, old_value))
+        for old_key, old_value in evicted:
+            self._writeSpill(old_key, old_value)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def cache_info(self):
+        """
+        Get statistics in the manner of functools.lru_cache
+
+        :return: string
+        """
+        return 'ResponseCache(entries={}, bytes={}, max_bytes={}, spilled={}, {})'.format(
+            len(self.entries), self.size, self.max_bytes, len(self.spilled),
+            ', '.join('{}={}'.format(x, y) for x, y in self.counter.items()))
+
+    def _spillPath(self, key):
+        return os.path.join(self.spill_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle')
+
+    def _writeSpill(self, key, value):
+        success, decoded, response, elapsed = value
+        record = (key, success, decoded, elapsed, None)
+        if response is not None:
+            record = (key, success, decoded, elapsed, (response.status, dict(response.getheaders()), response.text))
+        try:
+            with open(self._spillPath(key), 'wb') as spill_file:
+                pickle.dump(record, spill_file)
+        except Exception as e:
+            my_logger.debug('Could not spill cached response for {}: {}'.format(key, repr(e)))
+            return
+        with self.lock:
+            self.spilled.add(key)
+            self.counter['spillWrites'] += 1
+
+    def _readSpill(self, key):
+        try:
+            with open(self._spillPath(key), 'rb') as spill_file:
+                stored_key, success, decoded, elapsed, stored_response = pickle.load(spill_file)
+        except Exception as e:
+            my_logger.debug('Could not read spilled response for {}: {}'.format(key, repr(e)))
+            return None
+        if stored_key != key:
+            return None
+        response = None
+        if stored_response is not None:
+            status, headers, text = stored_response
+            response = rf.rest.v1.StaticRestResponse(Status=status, Headers=headers, Content=text)
+        return success, decoded, response, elapsed
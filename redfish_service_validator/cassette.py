@@ -0,0 +1,60 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+import hashlib
+import json
+import os
+from datetime import timedelta
+
+import redfish as rf
+
+
+class CassetteError(Exception):
+    """Exception used when a response was not recorded in the cassette"""
+    def __init__(self, msg=None):
+        super(CassetteError, self).__init__(msg)
+
+
+class Cassette():
+    """
+    Directory of recorded service responses, one JSON file per URI
+
+    Each file holds the URI, status, headers, body and elapsed time of the response
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, URILink):
+        return os.path.join(self.directory, hashlib.sha1(URILink.encode('utf-8')).hexdigest() + '.json')
+
+    def record(self, URILink, response, elapsed):
+        """
+        Write a response to the cassette, replacing any earlier recording of the URI
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            'uri': URILink,
+            'status': response.status,
+            'headers': dict(response.getheaders()),
+            'body': response.text,
+            'elapsed': elapsed.total_seconds() if isinstance(elapsed, timedelta) else elapsed
+        }
+        with open(self._path(URILink), 'w') as cassette_file:
+            json.dump(entry, cassette_file)
+
+    def play(self, URILink):
+        """
+        Read a recorded response from the cassette
+
+        :return: (response, elapsed)
+        """
+        try:
+            with open(self._path(URILink)) as cassette_file:
+                entry = json.load(cassette_file)
+        except FileNotFoundError:
+            entry = None
+        if entry is None or entry.get('uri') != URILink:
+            raise CassetteError('No response recorded in {} for {}'.format(self.directory, URILink))
+        response = rf.rest.v1.StaticRestResponse(Status=entry['status'], Headers=entry['headers'], Content=entry['body'])
+        return response, timedelta(seconds=entry['elapsed'])
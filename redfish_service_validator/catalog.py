@@ -1,11 +1,19 @@
+import bisect
 import glob, copy, difflib
+import hashlib
 import logging
+import os
+import pickle
 import re
+import shutil
+import sys
+import threading
 from collections import namedtuple
 from enum import Enum, auto
+from functools import lru_cache
 from os import path
 
-from bs4 import BeautifulSoup
+from lxml import etree
 
 from redfish_service_validator.helper import (
     getNamespace,
@@ -15,12 +23,22 @@ from redfish_service_validator.helper import (
     splitVersionString,
 )
 
-includeTuple = namedtuple("include", ["Namespace", "Uri"])
+includeTuple = namedtuple("includeTuple", ["Namespace", "Uri"])
+
+# Element of a CSDL document: tag name without namespace, attributes, Annotations by Term, and other child elements
+CSDLElement = namedtuple("CSDLElement", ["tag", "attrs", "annotations", "children"])
+
+# Annotation of a CSDL element: attributes, texts of the String elements of its Collection (None without a Collection),
+# and its Records as dicts of PropertyValue attributes by Property
+Annotation = namedtuple("Annotation", ["attrs", "strings", "records"])
 
 my_logger = logging.getLogger(__name__)
 
 REDFISH_ABSENT = "n/a"
 
+# marks a slot of a RedfishProperty that is not set
+REDFISH_UNSET = object()
+
 URI_ID_REGEX = '\{[A-Za-z0-9]*Id\}'
 
 VALID_ID_REGEX = '([A-Za-z0-9.!#$&-;=?\[\]_~])+'
@@ -40,7 +58,105 @@ excerpt_info_by_type = {
 
 allowed_annotations = ['odata', 'Redfish', 'Privileges', 'Message']
 
-def get_fuzzy_property(prop_name: str, jsondata: dict, allPropList=[]):
+# Bump when the pickled layout of the catalog classes changes, so older compiled catalogs are rebuilt
+COMPILED_CATALOG_VERSION = 11
+
+def getSchemaHash(filepath):
+    """
+    Get a hash of the names and contents of the schema files in a directory
+
+    :return: hex digest
+    """
+    my_hash = hashlib.sha256(str(COMPILED_CATALOG_VERSION).encode('utf-8'))
+    for x in sorted(glob.glob(path.join(filepath, "*"))):
+        my_hash.update(path.split(x)[-1].encode('utf-8'))
+        with open(x, 'rb') as f:
+            my_hash.update(hashlib.sha256(f.read()).digest())
+    return my_hash.hexdigest()
+
+def getCompiledCatalogPath(filepath, schema_hash):
+    """
+    Get the directory of a compiled catalog, stored next to the schema directory
+
+    :return: path, e.g. ./SchemaFiles/metadata-<hash>.catalog for ./SchemaFiles/metadata
+    """
+    return "{}-{}.catalog".format(path.normpath(filepath), schema_hash[:16])
+
+def getCompiledCatalogPattern(filepath):
+    """
+    Get a glob pattern matching the compiled catalogs of a schema directory, and not those of directories sharing its name as a prefix
+
+    :return: pattern, e.g. ./SchemaFiles/metadata-<16 hex digits>.catalog for ./SchemaFiles/metadata
+    """
+    return "{}-{}.catalog".format(glob.escape(path.normpath(filepath)), '[0-9a-f]' * 16)
+
+COMMENT_REGEX = re.compile(r'<!--.*?-->', re.S)
+SCHEMA_REGEX = re.compile(r'<(?:\w+:)?Schema\s([^>]*)>')
+REFERENCE_REGEX = re.compile(r'<(?:\w+:)?Reference\s([^>]*?)(?:/>|>(.*?)</(?:\w+:)?Reference>)', re.S)
+INCLUDE_REGEX = re.compile(r'<(?:\w+:)?Include\s([^>]*)>')
+ATTRIBUTE_REGEX = re.compile(r'([\w:]+)\s*=\s*(["\'])(.*?)\2', re.S)
+
+def getSchemaNamespaces(data):
+    """
+    Scan the text of a schema file for its Schema namespaces and the aliases of its references, without parsing it
+
+    :return: list of namespaces, dict of namespaces by alias
+    """
+    data = COMMENT_REGEX.sub('', data)
+    classes, alias = [], {}
+    for my_attrs in SCHEMA_REGEX.findall(data):
+        my_attrs = {x: y for x, _, y in ATTRIBUTE_REGEX.findall(my_attrs)}
+        if 'Namespace' in my_attrs:
+            classes.append(my_attrs['Namespace'])
+    for ref_attrs, includes in REFERENCE_REGEX.findall(data):
+        if 'Uri' not in {x for x, _, _ in ATTRIBUTE_REGEX.findall(ref_attrs)}:
+            continue
+        for my_attrs in INCLUDE_REGEX.findall(includes):
+            my_attrs = {x: y for x, _, y in ATTRIBUTE_REGEX.findall(my_attrs)}
+            if 'Namespace' in my_attrs and 'Alias' in my_attrs:
+                alias[my_attrs['Alias']] = my_attrs['Namespace']
+    return classes, alias
+
+def getTagName(element):
+    return element.tag.rpartition('}')[2]
+
+def getAttributes(element):
+    # names and values repeat across documents, interning them shares one copy in memory and in compiled catalogs
+    return {sys.intern(x): sys.intern(y) for x, y in element.attrib.items()}
+
+def getRecord(element):
+    return {sys.intern(x.get('Property')): getAttributes(x) for x in element if getTagName(x) == 'PropertyValue'}
+
+def getAnnotation(element):
+    """
+    Get an Annotation from an lxml element
+    """
+    strings, records = None, []
+    for child in element:
+        if getTagName(child) == 'Collection':
+            strings = [x.text for x in child if getTagName(x) == 'String']
+            records.extend(getRecord(x) for x in child if getTagName(x) == 'Record')
+        elif getTagName(child) == 'Record':
+            records.append(getRecord(child))
+    return Annotation(getAttributes(element), strings, records)
+
+# descriptive annotations are never checked, so they are not kept in the catalog
+DESCRIPTION_TERMS = frozenset(['OData.Description', 'OData.LongDescription'])
+
+def getCSDLElement(element):
+    """
+    Get a CSDLElement from an lxml element and its descendants
+    """
+    annotations, children = {}, []
+    for child in element:
+        if getTagName(child) == 'Annotation':
+            if child.get('Term') and child.get('Term') not in DESCRIPTION_TERMS:
+                annotations[sys.intern(child.get('Term'))] = getAnnotation(child)
+        else:
+            children.append(getCSDLElement(child))
+    return CSDLElement(sys.intern(getTagName(element)), getAttributes(element), annotations, children)
+
+def get_fuzzy_property(prop_name: str, jsondata: dict, allPropList=[], type_obj=None):
     """
     Get property closest to the discovered property.
 
@@ -48,12 +164,16 @@ def get_fuzzy_property(prop_name: str, jsondata: dict, allPropList=[]):
         prop_name (str): Key of property
         jsondata (dict): Dictionary of payload
         allPropList (list, optional): List of possible properties of this particular payload. Defaults to [].
+        type_obj (RedfishType, optional): Type defining most keys of jsondata, whose index of its property names is used. Defaults to None.
 
     Returns:
         prop_name: Closest match
         rtype: str
     """
-    possibleMatch = difflib.get_close_matches(prop_name, list(jsondata), 1, 0.70)
+    if type_obj is not None:
+        possibleMatch = type_obj.getFuzzyMatcher().getCloseMatches(prop_name, jsondata)
+    else:
+        possibleMatch = difflib.get_close_matches(prop_name, list(jsondata), 1, 0.70)
     if len(possibleMatch) > 0 and possibleMatch[0] not in [
         s[2] for s in allPropList if s[2] != prop_name
     ]:
@@ -81,38 +201,120 @@ class SchemaCatalog:
     From Catalog, you can get any Schema by it's filename, or its classes
     """
 
-    def __init__(self, filepath: str, metadata: object = None):
+    def __init__(self, filepath: str, metadata: object = None, compiled: bool = False):
         """Init
 
         Args:
             filepath (str): Directory of metadata
             metadata (object, optional): Preestablished metadata. Defaults to None.
+            compiled (bool, optional): Load from, or save, a compiled catalog next to the directory. Defaults to False.
         """
         self.filepath = filepath
         self.alias = {}
         self.catalog = {}
         self.catalog_by_class = {}
+        self.files = {}
+        self.compiled_path, self.compiled_writable = None, True
+        self.lock = threading.Lock()
         self.flags = {
             'ignore_uri_checks': False
         }
         my_logger.debug("Creating Schema catalog from filepath {}".format(filepath))
 
-        # create SchemaDoc objects
+        if compiled:
+            self.compiled_path = getCompiledCatalogPath(filepath, getSchemaHash(filepath))
+            index = self.loadCompiled('index')
+            if index is not None:
+                self.files = {x: path.join(filepath, x) for x in index[0]}
+                self.catalog_by_class, self.alias = index[1:]
+                return
+            for x in glob.glob(getCompiledCatalogPattern(filepath)):
+                if x == self.compiled_path:
+                    continue
+                if path.isdir(x):
+                    shutil.rmtree(x, ignore_errors=True)
+                else:
+                    os.remove(x)
+
+        # index the files by namespace, SchemaDoc objects are created when first used
         for x in glob.glob(path.join(filepath, "*")):
             with open(x) as f:
                 my_name = path.split(x)[-1]
-                schema = SchemaDoc(f.read(), self, my_name)
-                self.catalog[my_name] = schema
+                classes, alias = getSchemaNamespaces(f.read())
+                self.files[my_name] = x
 
-            base_names = [getNamespaceUnversioned(x) for x in schema.classes if getNamespaceUnversioned(x) not in schema.classes]
-            for item in list(schema.classes.keys()) + base_names:
+            base_names = [getNamespaceUnversioned(x) for x in classes if getNamespaceUnversioned(x) not in classes]
+            for item in classes + base_names:
                 if item not in self.catalog_by_class:
-                    self.catalog_by_class[item] = [schema]
+                    self.catalog_by_class[item] = [my_name]
                 else:
-                    self.catalog_by_class[item].append(schema)
-        
-        for _, schema in self.catalog.items():
-            self.alias.update(schema.alias)
+                    self.catalog_by_class[item].append(my_name)
+            self.alias.update(alias)
+
+        if compiled:
+            self.saveCompiled('index', (list(self.files), self.catalog_by_class, self.alias))
+
+    def loadCompiled(self, name):
+        """
+        Load an index or document saved by saveCompiled from the same schema files
+
+        :return: object, or None if not saved
+        """
+        compiled_path = path.join(self.compiled_path, name + '.pickle')
+        if not path.isfile(compiled_path):
+            return None
+        try:
+            with open(compiled_path, 'rb') as f:
+                unpickler = pickle.Unpickler(f)
+                unpickler.persistent_load = lambda pid: self
+                return unpickler.load()
+        except Exception as e:
+            my_logger.warning('Could not load compiled Schema catalog {}, rebuilding: {}'.format(compiled_path, repr(e)))
+            return None
+
+    def saveCompiled(self, name, obj):
+        """
+        Save an index or document of this catalog to the compiled catalog next to the schema directory
+
+        Saving stops at the first failure, as for a read-only schema directory; the compiled catalog is only an optimization
+        """
+        if not self.compiled_writable:
+            return
+        compiled_path = path.join(self.compiled_path, name + '.pickle')
+        temp_path = '{}.{}.tmp'.format(compiled_path, os.getpid())
+        try:
+            os.makedirs(self.compiled_path, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+                # documents refer back to their catalog, which is the one loading them
+                pickler.persistent_id = lambda obj: 'catalog' if obj is self else None
+                pickler.dump(obj)
+            os.replace(temp_path, compiled_path)
+        except Exception as e:
+            my_logger.warning('Could not save compiled Schema catalog {}, schema files will be parsed on every run: {}'.format(compiled_path, repr(e)))
+            self.compiled_writable = False
+            if path.isfile(temp_path):
+                os.remove(temp_path)
+
+    def getSchemaDoc(self, name):
+        """
+        Get Document by file name, parsing it the first time it is used
+
+        :param name: file name in the schema directory
+        :type name: str
+        :return: Schema Document
+        :rtype: SchemaDoc
+        """
+        with self.lock:
+            if name not in self.catalog:
+                schema = self.loadCompiled(name) if self.compiled_path else None
+                if schema is None:
+                    with open(self.files[name]) as f:
+                        schema = SchemaDoc(f.read(), self, name)
+                    if self.compiled_path:
+                        self.saveCompiled(name, schema)
+                self.catalog[name] = schema
+            return self.catalog[name]
 
     def getSchemaDocByClass(self, typename):
         """
@@ -129,7 +331,7 @@ class SchemaCatalog:
         typename = getNamespaceUnversioned(typename)
         typename = self.alias.get(typename, typename)
         if typename in self.catalog_by_class:
-            return self.catalog_by_class[typename][0]
+            return self.getSchemaDoc(self.catalog_by_class[typename][0])
         else:
             raise MissingSchemaError( "Could not find any Schema with these parameters {}".format(typename))
 
@@ -170,18 +372,19 @@ class SchemaDoc:
 
     def __init__(self, data: str, catalog: SchemaCatalog = None, name: str = None):
         # set up document
-        self.soup = BeautifulSoup(data, "xml")
+        if isinstance(data, str):
+            data = data.lstrip('\ufeff').encode('utf-8')
+        edmxTag = etree.fromstring(data, etree.XMLParser(recover=True, remove_comments=True, remove_pis=True))
         self.name = str(name)
         self.origin = "local"
         self.catalog = catalog
         self.classes = {}
         self.alias = {}
 
-        edmxTag = self.soup.find("Edmx", recursive=False)
-        reftags = edmxTag.find_all("Reference", recursive=False)
+        reftags = [x for x in edmxTag if getTagName(x) == "Reference"]
         self.refs = {}
         for ref in reftags:
-            includes = ref.find_all("Include", recursive=False)
+            includes = [x for x in ref if getTagName(x) == "Include"]
             for item in includes:
                 uri = ref.get("Uri")
                 ns, alias = (item.get(x) for x in ["Namespace", "Alias"])
@@ -200,17 +403,45 @@ class SchemaDoc:
 
         cntref = len(self.refs)
 
-        parentTag = edmxTag.find("DataServices", recursive=False)
-        children = parentTag.find_all("Schema", recursive=False)
+        parentTag = next(x for x in edmxTag if getTagName(x) == "DataServices")
+        children = [getCSDLElement(x) for x in parentTag if getTagName(x) == "Schema"]
         self.classes = {}
         for child in children:
-            self.classes[child["Namespace"]] = SchemaClass(child, self)
+            self.classes[child.attrs["Namespace"]] = SchemaClass(child, self)
+
+        # parsed versions of the namespaces, sorted, and of the namespaces defining each type, in document order
+        self.versions = sorted(splitVersionString(x) for x in self.classes)
+        self.versioned = sorted(splitVersionString(x) for x in self.classes if getVersion(x) is not None)
+        self.type_versions = {}
+        for namespace, schema in self.classes.items():
+            for my_type in schema.my_types:
+                self.type_versions.setdefault(my_type, ([], []))
+                self.type_versions[my_type][0].append(splitVersionString(namespace))
+                self.type_versions[my_type][1].append(namespace)
         my_logger.debug(
             "References generated from {}: {} out of {}".format(
                 name, cntref, len(self.refs)
             )
         )
 
+    def getCastNamespace(self, my_type, limit):
+        """
+        Get the namespace defining a type that is last in the document, among those with a version no higher than limit
+
+        :param my_type: type name without its namespace
+        :param limit: version tuple
+        :return: namespace, or None
+        """
+        versions, namespaces = self.type_versions.get(my_type, ([], []))
+        if all(x <= y for x, y in zip(versions, versions[1:])):
+            # namespaces in version order, the usual layout of a schema document
+            index = bisect.bisect_right(versions, limit)
+            return namespaces[index - 1] if index else None
+        for version, namespace in zip(reversed(versions), reversed(namespaces)):
+            if version <= limit:
+                return namespace
+        return None
+
     def getReference(self, namespace):
         """getSchemaFromReference
 
@@ -263,35 +494,41 @@ class SchemaDoc:
     
 
 class SchemaClass:
-    def __init__(self, soup, owner: SchemaDoc):
+    def __init__(self, element: CSDLElement, owner: SchemaDoc):
         super().__init__()
         self.parent_doc = owner
         self.catalog = owner.catalog
-        self.class_soup = soup
-        self.class_name = soup["Namespace"]
+        self.class_name = element.attrs["Namespace"]
         self.entity_types, self.complex_types, self.enum_types, self.def_types = {}, {}, {}, {}
+        self.actions = {}
+        self.terms = {}
+        self.dynamic_types = {}
 
-        for x in self.class_soup.find_all(["EntityType"], recursive=False):
-            self.entity_types[x["Name"]] = RedfishType(x, self)
-
-        for x in self.class_soup.find_all(["ComplexType"], recursive=False):
-            self.complex_types[x["Name"]] = RedfishType(x, self)
+        my_dicts = {'EntityType': self.entity_types, 'ComplexType': self.complex_types, 'EnumType': self.enum_types,
+                    'TypeDefinition': self.def_types, 'Term': self.terms}
+        for x in element.children:
+            if x.tag in my_dicts:
+                my_dicts[x.tag][x.attrs["Name"]] = RedfishType(x, self)
+            elif x.tag == 'Action':
+                self.actions[x.attrs["Name"]] = x
 
-        for x in self.class_soup.find_all(["EnumType"], recursive=False):
-            self.enum_types[x["Name"]] = RedfishType(x, self)
+        self.my_types = {**self.entity_types, **self.complex_types, **self.enum_types, **self.def_types}
 
-        for x in self.class_soup.find_all(["TypeDefinition"], recursive=False):
-            self.def_types[x["Name"]] = RedfishType(x, self)
-        
-        self.actions = {}
-        for x in self.class_soup.find_all(["Action"], recursive=False):
-            self.actions[x["Name"]] = x
+    def __getstate__(self):
+        # dynamic property types are made while validating, they are not part of the compiled schema
+        return {**self.__dict__, 'dynamic_types': {}}
 
-        self.terms = {}
-        for x in self.class_soup.find_all(["Term"], recursive=False):
-            self.terms[x["Name"]] = RedfishType(x, self)
+    def getDynamicPropertyType(self, my_odata_type):
+        """
+        Get the type of the additional properties of an Edm type in this schema, shared by every property generated with it
 
-        self.my_types = {**self.entity_types, **self.complex_types, **self.enum_types, **self.def_types}
+        :param my_odata_type: Edm type of the additional properties
+        """
+        if my_odata_type not in self.dynamic_types:
+            # Make a pseudo element because RedfishType requires it, its name is not used by Terms
+            my_new_term = CSDLElement('Term', {'Name': getType(my_odata_type), 'Type': my_odata_type}, {}, [])
+            self.dynamic_types[my_odata_type] = RedfishType(my_new_term, self)
+        return self.dynamic_types[my_odata_type]
 
     def getHighestType(self, my_full_type, limit=None):
         """
@@ -300,7 +537,6 @@ class SchemaClass:
         :param acquiredtype: Type available
         :param limit: Version string limit (full namespace or just version 'v1_x_x')
         """
-        typelist = []
         my_type = getType(my_full_type)
 
         if limit is not None:
@@ -310,30 +546,58 @@ class SchemaClass:
             else:
                 limit = getVersion(limit)
 
-        for _, schema in self.parent_doc.classes.items():
-            newNamespace = schema.class_name
-            if limit is not None:
-                if getVersion(newNamespace) is None:
-                    continue
-                if splitVersionString(newNamespace) > splitVersionString(limit):
-                    continue
-            if (my_type in self.my_types):
-                typelist.append(splitVersionString(newNamespace))
+        typelist = []
+        if (my_type in self.my_types):
+            if limit is None:
+                typelist = self.parent_doc.versions
+            else:
+                versions = self.parent_doc.versioned
+                typelist = versions[:bisect.bisect_right(versions, splitVersionString(limit))]
 
         if len(typelist) > 1:
-            for ns in reversed(sorted(typelist)):
-                my_logger.debug("{}   {}".format(ns, getType(my_type)))
-                my_type = getNamespaceUnversioned(my_full_type) + ".v{}_{}_{}".format(*ns) + "." + getType(my_full_type)
-                return my_type
+            ns = typelist[-1]
+            my_logger.debug("{}   {}".format(ns, getType(my_type)))
+            my_type = getNamespaceUnversioned(my_full_type) + ".v{}_{}_{}".format(*ns) + "." + getType(my_full_type)
         return my_type
 
 
+class TypeTree(list):
+    """
+    List of a RedfishType and its parent types, with their names in a set for membership checks
+    """
+    def __init__(self, types):
+        super().__init__(types)
+        self.names = frozenset(str(x) for x in self)
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return item in self.names
+        return super().__contains__(item)
+
+
+# lookups across documents, resolved on first use and never pickled
+RESOLVED_ATTRIBUTES = ('_type_tree', '_base_type', '_properties', '_has_additional', '_capabilities', '_dynamic', '_uris', '_property_facts', '_skeleton', '_value_checks', '_fuzzy_matcher')
+
+# Facts checked for each value of a property, resolved once per type and read while walking the RedfishObject tree:
+# base type and collection flag, mandatory and nullable flags, and the deprecation warnings of the property
+PropertyFacts = namedtuple("PropertyFacts", ["base_type", "is_collection", "mandatory", "nullable", "deprecations"])
+
+CAPABILITY_TERMS = [('CanInsert', 'Capabilities.InsertRestrictions'), ('CanUpdate', 'Capabilities.UpdateRestrictions'), ('CanDelete', 'Capabilities.DeleteRestrictions')]
+
+
 class RedfishType:
     """Redfish Type
 
     Represents tags of 'Property', 'NavigationProperty' in an EntityType/ComplexType
     And also represents EntityType/ComplexType/EnumType/TypeDefinitions, not basic types like Edm
     """
+    # a full schema set has tens of thousands of types and properties, slots keep each one small
+    __slots__ = ('owner', 'catalog', 'tag_type', 'attrs', 'annotations', 'members', 'member_set', 'parent_type',
+                 'IsPropertyType', 'IsNav', 'fulltype', 'Namespace', 'Type',
+                 'IsMandatory', 'IsNullable', 'AutoExpand', 'Deprecated', 'Revisions', 'Excerpt', 'Permissions',
+                 'excerptType', 'excerptTags', 'property_pattern',
+                 'annotation_errors', 'additional', 'capabilities', 'dynamic', 'uris', 'unique_properties') + RESOLVED_ATTRIBUTES
+
     def __eq__(self, other):
         if isinstance(other, str):
             return other == str(self)
@@ -343,13 +607,19 @@ class RedfishType:
     def __repr__(self):
         return self.fulltype
     
-    def __init__(self, soup, owner: SchemaClass):
+    def __init__(self, element: CSDLElement, owner: SchemaClass):
 
         self.owner = owner
         self.catalog = owner.catalog
+        for name in RESOLVED_ATTRIBUTES:
+            setattr(self, name, None)
 
-        self.type_soup = soup
-        self.tag_type = soup.name
+        self.tag_type = element.tag
+        self.attrs = element.attrs
+        self.annotations = element.annotations
+        self.members = [x.attrs["Name"] for x in element.children if x.tag == 'Member']
+        self.member_set = frozenset(self.members)
+        self.parent_type = self._getParentType()
 
         if self.tag_type in ['NavigationProperty', 'Property', 'Term']:
             self.IsPropertyType = True
@@ -358,33 +628,28 @@ class RedfishType:
         else:
             self.IsPropertyType = False
             self.IsNav = False
-            self.fulltype = self.owner.class_name + '.' + soup['Name']
+            self.fulltype = self.owner.class_name + '.' + self.attrs['Name']
         self.Namespace, self.Type = getNamespace(self.fulltype), getType(self.fulltype)
 
-        self.tags = {}
-        for tag in self.type_soup.find_all(recursive=False):
-            if(tag.get('Term')):
-                self.tags[tag['Term']] = tag.attrs
-                if (tag.get('Term') == 'Redfish.Revisions'):
-                    self.tags[tag['Term']] = tag.find_all('Record')
-
-        propPermissions = self.tags.get('OData.Permissions')
+        propPermissions = self.annotations.get('OData.Permissions')
+        propDeprecated = self.annotations.get('Redfish.Deprecated')
+        propRevisions = self.annotations.get('Redfish.Revisions')
 
-        self.IsMandatory = self.tags.get('Redfish.Required') is not None
-        self.IsNullable = self.type_soup.get("Nullable", "true") not in ["false", False, "False"]
-        self.AutoExpand = self.tags.get('OData.AutoExpand', None) is not None or self.tags.get('OData.AutoExpand'.lower(), None) is not None
-        self.Deprecated = self.tags.get('Redfish.Deprecated')
-        self.Revisions = self.tags.get('Redfish.Revisions')
+        self.IsMandatory = self.annotations.get('Redfish.Required') is not None
+        self.IsNullable = self.attrs.get("Nullable", "true") not in ["false", False, "False"]
+        self.AutoExpand = self.annotations.get('OData.AutoExpand', None) is not None or self.annotations.get('OData.AutoExpand'.lower(), None) is not None
+        self.Deprecated = propDeprecated.attrs if propDeprecated is not None else None
+        self.Revisions = propRevisions.records if propRevisions is not None else None
         self.Excerpt = False
 
-        self.Permissions = propPermissions['EnumMember'] if propPermissions is not None else None
+        self.Permissions = propPermissions.attrs['EnumMember'] if propPermissions is not None else None
 
         self.excerptType = ExcerptTypes.NEUTRAL
         self.excerptTags = []
 
         for annotation, val in excerpt_info_by_type.items():
-            if annotation in self.tags:
-                self.excerptTags = self.tags.get(annotation).get('String', '').split(',')
+            if annotation in self.annotations:
+                self.excerptTags = self.annotations.get(annotation).attrs.get('String', '').split(',')
                 self.excerptTags = [x.strip(' ') for x in self.excerptTags] if self.excerptTags != [''] else []
                 self.excerptType = val
         
@@ -392,31 +657,69 @@ class RedfishType:
 
         self.property_pattern = None
 
+        # annotation facts of this type alone, combined over the type tree on first use
+        annotation_errors = []
+        additionalElement = self.annotations.get("OData.AdditionalProperties")
+        self.additional = ('Bios' in self.fulltype and 'Attributes' in self.fulltype) or self.fulltype == 'MessageRegistry.v1_0_0.MessageProperty' or (
+            additionalElement is not None and additionalElement.attrs.get("Bool", False) in ["True", "true", True])
+
+        self.capabilities = {}
+        for key, term in CAPABILITY_TERMS:
+            capability = self.annotations.get(term)
+            if capability:
+                property_values = [y for x in capability.records for y in x.values()]
+                if property_values:
+                    self.capabilities[key] = property_values[0].get('Bool', 'False').lower() == 'true'
+                else:
+                    annotation_errors.append(term)
+
+        self.dynamic = None
+        dynamic = self.annotations.get("Redfish.DynamicPropertyPatterns")
+        if dynamic:
+            # create PropertyPattern dict containing pattern and type for DynamicPropertyPatterns validation
+            pattern_elem = next((x["Pattern"] for x in dynamic.records if "Pattern" in x), None)
+            type_elem = next((x["Type"] for x in dynamic.records if "Type" in x), None)
+            if pattern_elem and type_elem:
+                self.dynamic = {"Pattern": pattern_elem.get("String"), "Type": type_elem.get("String")}
+            elif pattern_elem or type_elem:
+                annotation_errors.append("Redfish.DynamicPropertyPatterns")
+
+        self.uris = None
+        uriElement = self.annotations.get("Redfish.Uris")
+        if uriElement is not None:
+            if uriElement.strings is None or None in uriElement.strings:
+                annotation_errors.append("Redfish.Uris")
+            else:
+                self.uris = uriElement.strings
+        self.annotation_errors = tuple(annotation_errors)
 
         # get properties
-        prop_tags = self.type_soup.find_all( ["NavigationProperty", "Property"], recursive=False)
+        prop_tags = [x for x in element.children if x.tag in ["NavigationProperty", "Property"]]
     
         self.unique_properties = {}
 
         for innerelement in prop_tags:
-            prop_name = innerelement["Name"]
+            prop_name = innerelement.attrs["Name"]
             self.unique_properties[prop_name] = RedfishType(innerelement, self.owner)
-    
+
+    def __getstate__(self):
+        # resolved lookups refer to types of other documents, which are compiled separately
+        return {name: getattr(self, name) for name in self.__slots__ if name not in RESOLVED_ATTRIBUTES}
+
+    def __setstate__(self, state):
+        for name in RESOLVED_ATTRIBUTES:
+            setattr(self, name, None)
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _getTreeTypes(self):
+        return [x for x in self.getTypeTree() if isinstance(x, RedfishType)]
+
     @property
     def HasAdditional(self):
-        my_parents = self.getTypeTree()
-        for my_type in my_parents:
-            if not isinstance(my_type, RedfishType): continue
-            if 'Bios' in str(my_type) and 'Attributes' in str(my_type):
-                return True
-            if my_type == 'MessageRegistry.v1_0_0.MessageProperty':
-                return True
-            additionalElement = my_type.type_soup.find("Annotation", attrs={"Term": "OData.AdditionalProperties"})
-            HasAdditional = ( False if additionalElement is None else (
-                    True if additionalElement.get("Bool", False) in ["True", "true", True]
-                    else False))
-            if HasAdditional: return True
-        return False
+        if self._has_additional is None:
+            self._has_additional = any(x.additional for x in self._getTreeTypes())
+        return self._has_additional
 
     @property
     def CanUpdate(self):
@@ -431,56 +734,32 @@ class RedfishType:
         return self.getCapabilities()['CanInsert']
 
     def getCapabilities(self):
-        my_dict = {'CanUpdate': False,
-                   'CanInsert': False,
-                   'CanDelete': False}
-
-        my_parents = self.getTypeTree()
-        for my_type in reversed(my_parents):
-            if not isinstance(my_type, RedfishType): continue
-            try:
-                element = my_type.type_soup.find("Annotation", attrs={"Term": "Capabilities.InsertRestrictions"})
-                if element:
-                    my_dict['CanInsert'] = element.find("PropertyValue").get('Bool', 'False').lower() == 'true'
-                element = my_type.type_soup.find("Annotation", attrs={"Term": "Capabilities.UpdateRestrictions"})
-                if element:
-                    my_dict['CanUpdate'] = element.find("PropertyValue").get('Bool', 'False').lower() == 'true'
-                element = my_type.type_soup.find("Annotation", attrs={"Term": "Capabilities.DeleteRestrictions"})
-                if element:
-                    my_dict['CanDelete'] = element.find("PropertyValue").get('Bool', 'False').lower() == 'true'
-            except Exception as e:
-                my_logger.debug('Exception caught while checking Uri', exc_info=1)
-                my_logger.warning('Could not gather info from Capabilities annotation')
-                return {'CanUpdate': False, 'CanInsert': False, 'CanDelete': False}
-
-        return my_dict
+        if self._capabilities is None:
+            my_dict = {'CanUpdate': False,
+                       'CanInsert': False,
+                       'CanDelete': False}
+            for my_type in reversed(self._getTreeTypes()):
+                if any(term in my_type.annotation_errors for _, term in CAPABILITY_TERMS):
+                    # malformed annotations are not cached, so each use still reports them
+                    my_logger.warning('Could not gather info from Capabilities annotation')
+                    return {'CanUpdate': False, 'CanInsert': False, 'CanDelete': False}
+                my_dict.update(my_type.capabilities)
+            self._capabilities = my_dict
+        return dict(self._capabilities)
 
     @property
     def DynamicProperties(self):
-        my_parents = self.getTypeTree()
-        for my_type in reversed(my_parents):
-            if not isinstance(my_type, RedfishType): continue
-            try:
-                dynamic = my_type.type_soup.find("Annotation", attrs={"Term": "Redfish.DynamicPropertyPatterns"})
-                if dynamic: 
-                    # create PropertyPattern dict containing pattern and type for DynamicPropertyPatterns validation
-                    pattern_elem = dynamic.find("PropertyValue", Property="Pattern")
-                    type_elem = dynamic.find("PropertyValue", Property="Type")
-                    if pattern_elem and type_elem:
-                        return {
-                            "Pattern": pattern_elem.get("String"),
-                            "Type": type_elem.get("String"),
-                        }
-                    if pattern_elem and not type_elem or type_elem and not pattern_elem:
-                        raise ValueError('Cannot have pattern with Type in DynamicProperty annotation')
-
-            except Exception as e:
-                my_logger.debug('Exception caught while checking Dynamic', exc_info=1)
-                my_logger.warning('Could not gather info from DynamicProperties annotation')
-                return None 
-        
-        return None
-
+        if self._dynamic is None:
+            dynamic = False
+            for my_type in reversed(self._getTreeTypes()):
+                if "Redfish.DynamicPropertyPatterns" in my_type.annotation_errors:
+                    my_logger.warning('Could not gather info from DynamicProperties annotation')
+                    return None
+                if my_type.dynamic:
+                    dynamic = my_type.dynamic
+                    break
+            self._dynamic = dynamic
+        return self._dynamic or None
 
     def getUris(self):
         """
@@ -489,23 +768,22 @@ class RedfishType:
         :return: Array of Uris
         :rtype: list
         """
-        my_parents = self.getTypeTree()
+        if self._uris is not None:
+            return list(self._uris)
         expectedUris = []
-        for my_type in my_parents:
-            if not isinstance(my_type, RedfishType): continue
-            uriElement = my_type.type_soup.find("Annotation", attrs={"Term": "Redfish.Uris"})
-            if uriElement is not None:
-                try:
-                    all_strings = uriElement.find("Collection").find_all("String")
-                    expectedUris += [e.contents[0] for e in all_strings]
-                except Exception as e:
-                    my_logger.debug('Exception caught while checking Uri', exc_info=1)
-                    my_logger.warning('Could not gather info from Redfish.Uris annotation')
-                    expectedUris = []
-        return expectedUris
+        malformed = False
+        for my_type in self._getTreeTypes():
+            if "Redfish.Uris" in my_type.annotation_errors:
+                my_logger.warning('Could not gather info from Redfish.Uris annotation')
+                expectedUris = []
+                malformed = True
+            elif my_type.uris:
+                expectedUris += my_type.uris
+        if not malformed:
+            self._uris = expectedUris
+        return list(expectedUris)
      
-    @property 
-    def parent_type(self):
+    def _getParentType(self):
         """
         Returns string of the parent type, and if that type is a collection
 
@@ -513,10 +791,10 @@ class RedfishType:
             string, boolean
             None, False
         """
-        soup = self.type_soup
+        attrs = self.attrs
         parent_type = (
-            soup["UnderlyingType"] if self.tag_type == "TypeDefinition"
-            else soup.get("BaseType", soup.get("Type", None))
+            attrs["UnderlyingType"] if self.tag_type == "TypeDefinition"
+            else attrs.get("BaseType", attrs.get("Type", None))
         )
         if parent_type is not None:
             IsCollection = re.match('Collection\(.*\)', parent_type) is not None
@@ -524,20 +802,21 @@ class RedfishType:
         else:
             return None, False
         
-    def getTypeTree(self, tree=None):
+    def getTypeTree(self):
         """
-        Returns tree of RedfishType/string of parent types
+        Returns tree of RedfishType/string of parent types, resolved once per type
         """
-        if not tree: tree = [self]
-        my_type, collection = self.parent_type
-        if my_type:
-            if 'Edm.' not in my_type:
-                my_real_type = my_type
-                type_obj = self.owner.parent_doc.catalog.getSchemaDocByClass(my_real_type).getTypeInSchemaDoc(my_real_type)
-                return type_obj.getTypeTree(tree + [type_obj])
+        if self._type_tree is None:
+            my_type, collection = self.parent_type
+            if my_type:
+                if 'Edm.' not in my_type:
+                    type_obj = self.owner.parent_doc.catalog.getSchemaDocByClass(my_type).getTypeInSchemaDoc(my_type)
+                    self._type_tree = TypeTree([self] + type_obj.getTypeTree())
+                else:
+                    self._type_tree = TypeTree([self, my_type])
             else:
-                return tree + [my_type]
-        return tree
+                self._type_tree = TypeTree([self])
+        return self._type_tree
 
     def getBaseType(self, is_collection=False):
         """
@@ -550,29 +829,81 @@ class RedfishType:
             string, boolean
             None, False
         """
+        if self._base_type is None:
+            self._base_type = self._resolveBaseType()
+        my_base, my_collection = self._base_type
+        return my_base, my_collection or is_collection
+
+    def _resolveBaseType(self):
         if self.tag_type == "EnumType":
-            return 'enum', is_collection
+            return 'enum', False
         if self.tag_type == "ComplexType":
-            return 'complex', is_collection
+            return 'complex', False
         if self.tag_type == "EntityType":
-            return 'entity', is_collection
+            return 'entity', False
         if self.IsPropertyType:
             my_type, parent_collection = self.parent_type
-            is_collection=parent_collection or is_collection
             if 'Edm.' in my_type:
-                return my_type, is_collection
+                return my_type, parent_collection
             type_obj = self.owner.parent_doc.catalog.getSchemaDocByClass(my_type).getTypeInSchemaDoc(my_type)
-            return type_obj.getBaseType(is_collection)
-        return 'none', is_collection
+            return type_obj.getBaseType(parent_collection)
+        return 'none', False
+
+    def getPropertyFacts(self):
+        """
+        Returns the PropertyFacts of a property of this type
+        """
+        if self._property_facts is None:
+            deprecations = []
+            if not self.IsMandatory:
+                # <Annotation Term="Redfish.Deprecated" String="This property has been Deprecated in favor of Thermal.v1_1_0.Thermal.Fan.Name"/>
+                if self.Deprecated is not None:
+                    deprecations.append('The given property is deprecated: {}'.format(self.Deprecated.get('String', '')))
+                for tag_item in self.Revisions or []:
+                    if tag_item.get('Kind', {}).get('EnumMember') == 'Redfish.RevisionKind/Deprecated':
+                        desc_tag = tag_item.get('Description')
+                        if desc_tag:
+                            deprecations.append('The given property is deprecated: {}'.format(desc_tag.get('String', '')))
+                        else:
+                            deprecations.append('The given property is deprecated')
+            base_type, is_collection = self.getBaseType()
+            self._property_facts = PropertyFacts(base_type, is_collection, self.IsMandatory, self.IsNullable, tuple(deprecations))
+        return self._property_facts
+
+    def getSkeleton(self):
+        """
+        Returns the properties of an object of this type as (name, type, is_complex) tuples,
+        where is_complex is None if the schema of the property's type is missing
+        """
+        if self._skeleton is None:
+            skeleton = []
+            for prop, typ in self.getProperties().items():
+                try:
+                    base, collection = typ.getBaseType()
+                    skeleton.append((prop, typ, base == 'complex'))
+                except MissingSchemaError:
+                    skeleton.append((prop, typ, None))
+            self._skeleton = tuple(skeleton)
+        return self._skeleton
+
+    def getFuzzyMatcher(self):
+        """
+        Returns the index of the names of our properties used to suggest a property for an unknown key
+        """
+        if self._fuzzy_matcher is None:
+            self._fuzzy_matcher = FuzzyMatcher([x[0] for x in self.getSkeleton()])
+        return self._fuzzy_matcher
 
     def getProperties(self):
         """
         Returns all our properties from our current type and its parents
         """
-        all_properties = {}
-        for type_obj in self.getTypeTree():
-            all_properties.update(type_obj.unique_properties)
-        return all_properties
+        if self._properties is None:
+            all_properties = {}
+            for type_obj in self.getTypeTree():
+                all_properties.update(type_obj.unique_properties)
+            self._properties = all_properties
+        return self._properties
 
     def validate(self, val, added_pattern=None):
         """
@@ -580,20 +911,20 @@ class RedfishType:
         """
         my_logger.debug((self, val, self.fulltype, self.tag_type, self.parent_type))
         if val == REDFISH_ABSENT:
-            if self.type_soup.find("Annotation", attrs={"Term": "Redfish.Required"}):
+            if "Redfish.Required" in self.annotations:
                 raise ValueError("Should not be absent")
             else:
                 return True
         if val is None: 
-            if self.type_soup.get("Nullable") in ["false", "False", False]:
+            if self.attrs.get("Nullable") in ["false", "False", False]:
                 raise ValueError("Should not be null")
             else:
                 return True
         # recurse parent_types until we get a basic type...
         if self.tag_type == "EnumType":
-            my_enums = [x["Name"] for x in self.type_soup.find_all("Member")]
-            if val not in my_enums:
-                raise ValueError("Value {} Enum not found in {}".format(val, my_enums))
+            # members are strings, so other values are never found
+            if not isinstance(val, str) or val not in self.member_set:
+                raise ValueError("Value {} Enum not found in {}".format(val, self.members))
         if self.tag_type == "ComplexType":
             if not isinstance(val, dict):
                 raise ValueError("Complex value is not Dict")
@@ -606,22 +937,35 @@ class RedfishType:
                 type_obj = self.owner.parent_doc.catalog.getSchemaDocByClass(my_type).getTypeInSchemaDoc(my_type)
                 return type_obj.validate(val)
             else:
-                enum_annotation = self.type_soup.find('Annotation', attrs={'Term': 'Redfish.Enumeration'}, recursive=False)
-                validPatternAttr = self.type_soup.find('Annotation', attrs={'Term': 'Validation.Pattern'})
-                validMinAttr = self.type_soup.find('Annotation', attrs={'Term': 'Validation.Minimum'})
-                validMaxAttr = self.type_soup.find('Annotation', attrs={'Term': 'Validation.Maximum'})
-                validMin, validMax = int(validMinAttr['Int']) if validMinAttr is not None else None, \
-                    int(validMaxAttr['Int']) if validMaxAttr is not None else None
-                validPattern = validPatternAttr.get('String', '') if validPatternAttr is not None else None
+                validPattern, enumPattern, validMin, validMax = self.getValueChecks()
                 if added_pattern is not None:
                     validPattern = added_pattern
-
-                if my_type == 'Edm.String' and enum_annotation is not None:
-                    memberList = enum_annotation.find('Collection').find_all('PropertyValue', attrs={'Property': 'Member'})
-                    validPattern = '|'.join([re.escape(x.get('String')) for x in memberList if x.get('String')])
+                if enumPattern is not None:
+                    validPattern = enumPattern
 
                 return RedfishProperty.validate_basic(val, my_type, validPattern, validMin, validMax)
         return True
+
+    def getValueChecks(self):
+        """
+        Returns the Validation.Pattern, the pattern of the Redfish.Enumeration members of a string,
+        and the Validation.Minimum and Validation.Maximum of this type, parsed once
+        """
+        if self._value_checks is None:
+            enum_annotation = self.annotations.get('Redfish.Enumeration')
+            validPatternAttr = self.annotations.get('Validation.Pattern')
+            validMinAttr = self.annotations.get('Validation.Minimum')
+            validMaxAttr = self.annotations.get('Validation.Maximum')
+            validMin, validMax = int(validMinAttr.attrs['Int']) if validMinAttr is not None else None, \
+                int(validMaxAttr.attrs['Int']) if validMaxAttr is not None else None
+            validPattern = validPatternAttr.attrs.get('String', '') if validPatternAttr is not None else None
+
+            enumPattern = None
+            if self.parent_type[0] == 'Edm.String' and enum_annotation is not None:
+                memberList = [x['Member'] for x in enum_annotation.records if 'Member' in x]
+                enumPattern = '|'.join([re.escape(x.get('String')) for x in memberList if x.get('String')])
+            self._value_checks = (validPattern, enumPattern, validMin, validMax)
+        return self._value_checks
     
     def as_json(self):
         return self.createObj().as_json()
@@ -630,10 +974,123 @@ class RedfishType:
         return RedfishObject(self)
                 
 
+class UriMatcher:
+    """
+    Redfish.Uris templates of a type, compiled once
+
+    Ids match VALID_ID_REGEX, which also allows '/', so each template is matched as a whole rather than by segment
+    """
+    def __init__(self, uris):
+        self.uris = uris
+        self.regex = re.compile(re.sub(URI_ID_REGEX, VALID_ID_REGEX, "^{}$".format("|".join(uris))))
+        # per template, the Id segments counted from the end of the URI, with the type each one names
+        self.templates = []
+        for my_uri in uris:
+            my_uri_regex = re.compile(re.sub(URI_ID_REGEX, VALID_ID_REGEX, "^{}$".format(my_uri)))
+            id_sections = [(index, re.sub('\{|Id\}|', '', section)) for index, section in enumerate(my_uri.split('/')[::-1]) if re.match(URI_ID_REGEX, section)]
+            self.templates.append((my_uri_regex, id_sections))
+
+    def match(self, odata_id):
+        return self.regex.fullmatch(odata_id) is not None
+
+    def matchStrict(self, odata_id, id_chain):
+        """
+        Check a URI against the templates, with the types and Ids of its resource chain
+
+        :param id_chain: (type, Id property, URI segment) of the resource and its parents, from the resource up
+        :return: True if a template matches and each of its Ids names the type and Id of its resource
+        """
+        for my_uri_regex, id_sections in self.templates:
+            if my_uri_regex.fullmatch(odata_id) is None:
+                continue
+            if all(id_chain[index][0] == my_str and id_chain[index][1] == id_chain[index][2]
+                   for index, my_str in id_sections if index < len(id_chain)):
+                return True
+        return False
+
+
+class FuzzyMatcher:
+    """
+    Names bucketed by length, with the close matches of each word looked up, same as difflib.get_close_matches
+
+    Only names of a length that can reach the cutoff are compared, and the matches of a word are kept for later lookups
+    """
+    def __init__(self, names, cutoff=0.70):
+        self.cutoff = cutoff
+        self.names = set(names)
+        self.lengths = {}
+        for name in names:
+            self.lengths.setdefault(len(name), []).append(name)
+        self.matches = {}
+
+    def _getRatios(self, word, names):
+        """
+        Get the (ratio, name) of the names with a ratio to word of at least cutoff, best first
+        """
+        my_matcher = difflib.SequenceMatcher()
+        my_matcher.set_seq2(word)
+        ratios = []
+        for name in names:
+            my_matcher.set_seq1(name)
+            if my_matcher.real_quick_ratio() >= self.cutoff and my_matcher.quick_ratio() >= self.cutoff and my_matcher.ratio() >= self.cutoff:
+                ratios.append((my_matcher.ratio(), name))
+        return sorted(ratios, reverse=True)
+
+    def getCloseMatches(self, word, possibilities):
+        """
+        Get the best match of word in possibilities, as difflib.get_close_matches(word, possibilities, 1, cutoff)
+
+        :param possibilities: names, mostly from this index
+        :return: list of at most one name
+        """
+        if word not in self.matches:
+            # real_quick_ratio of two names only depends on their lengths
+            names = [name for length, names in self.lengths.items()
+                     if (2.0 * min(length, len(word)) / (length + len(word)) if length + len(word) else 1.0) >= self.cutoff
+                     for name in names]
+            self.matches[word] = self._getRatios(word, names)
+        best = next((x for x in self.matches[word] if x[1] in possibilities), None)
+        extras = self._getRatios(word, [x for x in possibilities if x not in self.names])
+        if extras and (best is None or extras[0] > best):
+            best = extras[0]
+        return [best[1]] if best is not None else []
+
+
+@lru_cache(maxsize=None)
+def getPattern(pattern):
+    """
+    Get a compiled pattern, compiled once for each pattern of the schemas
+    """
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=None)
+def getUriMatcher(uris):
+    """
+    Get the compiled matcher of a tuple of Redfish.Uris templates, shared by the types using them
+    """
+    return UriMatcher(uris)
+
+
 class RedfishProperty(object):
     """Property in a resource
     Represents all Types given, however, ComplexTypes are better suited to be RedfishObjects
+
+    Populated copies only hold their values in slots, the type facts stay on the shared RedfishType
     """
+    __slots__ = ('Name', 'Type', 'HasSchema', 'Populated', 'parent', 'added_pattern',
+                 'Value', 'IsValid', 'InAnnotation', 'SchemaExists', 'Exists')
+    all_slots = __slots__
+
+    def __copy__(self):
+        # copy the slots that are set, as copy.copy would copy a __dict__
+        eval_prop = object.__new__(type(self))
+        for name in type(self).all_slots:
+            value = getattr(self, name, REDFISH_UNSET)
+            if value is not REDFISH_UNSET:
+                setattr(eval_prop, name, value)
+        return eval_prop
+
     def __repr__(self):
         if self.Populated:
             return "{}--{}, Value: {}".format(self.Name, self.Type, self.Value)
@@ -673,7 +1130,7 @@ class RedfishProperty(object):
         return eval_prop
 
     def as_json(self):
-        my_dict = {x: y for x, y in vars(self).items() if x in ['Name', 'Type', 'Value', 'IsValid', 'Exists', 'SchemaExists']}
+        my_dict = {x: getattr(self, x) for x in ['Name', 'Type', 'Value', 'IsValid', 'SchemaExists', 'Exists'] if hasattr(self, x)}
         if isinstance(self.Type, RedfishType):
             my_dict['IsRequired'] = self.Type.IsMandatory
             my_dict['IsNullable'] = self.Type.IsNullable
@@ -695,7 +1152,7 @@ class RedfishProperty(object):
                 "Expected string value, got type {}".format(str(type(val)).strip("<>"))
             )
         if pattern is not None:
-            match = re.fullmatch(pattern, val)
+            match = getPattern(pattern).fullmatch(val)
             if match is None:
                 raise ValueError(
                     "String '{}' does not match pattern '{}'".format(
@@ -727,8 +1184,31 @@ class RedfishProperty(object):
                         str(val), str(maxVal)))
         return True
 
+    @staticmethod
+    def validate_bool(val):
+        if not isinstance(val, bool):
+            raise ValueError(
+                "Expected bool, got type {}".format(str(type(val)).strip("<>")))
+        return True
+
+    @staticmethod
+    def validate_int(val, minVal=None, maxVal=None):
+        if not isinstance(val, int):
+            raise ValueError("Expected int, got type {}".format(str(type(val)).strip("<>")))
+        return RedfishProperty.validate_number(val, minVal, maxVal)
+
+    @staticmethod
+    def validate_primitive(val):
+        if not isinstance(val, (int, float, str, bool)):
+            raise ValueError("Expected primitive, got type {}".format(str(type(val)).strip("<>")))
+        return True
+
     @staticmethod
     def validate_basic(val, my_type, validPattern=None, min=None, max=None):
+        validator = EDM_VALIDATORS.get(my_type)
+        if validator is not None:
+            return validator(val, validPattern, min, max)
+
         if "Collection(" in my_type:
             if not isinstance(val, list):
                 raise ValueError("Collection is not list")
@@ -742,42 +1222,28 @@ class RedfishProperty(object):
                     raise ValueError('{} invalid'.format(cnt))
             return paramPass
 
-        elif my_type == "Edm.Boolean":
-            if not isinstance(val, bool):
-                raise ValueError(
-                    "Expected bool, got type {}".format(str(type(val)).strip("<>")))
-            return True
-
-        elif my_type == "Edm.DateTimeOffset":
-            return RedfishProperty.validate_string(
-                val, r".*(Z|(\+|-)[0-9][0-9]:[0-9][0-9])")
-
-        elif my_type == "Edm.Duration":
-            return RedfishProperty.validate_string(
-                val, r"-?P([0-9]+D)?(T([0-9]+H)?([0-9]+M)?([0-9]+(\.[0-9]+)?S)?)?")
-
-        elif my_type == "Edm.Guid":
-            return RedfishProperty.validate_string(
-                val, r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
-
-        elif my_type == "Edm.String":
-            return RedfishProperty.validate_string(val, validPattern)
-
-        elif my_type in ["Edm.Int16", "Edm.Int32", "Edm.Int64", "Edm.Int"]:
-            if not isinstance(val, int):
-                raise ValueError("Expected int, got type {}".format(str(type(val)).strip("<>")))
-            return RedfishProperty.validate_number(val, min, max)
-
-        elif my_type == "Edm.Decimal" or my_type == "Edm.Double":
-            return RedfishProperty.validate_number(val, min, max)
+        return False
 
-        elif my_type == "Edm.Primitive" or my_type == "Edm.PrimitiveType":
-            if not isinstance(val, (int, float, str, bool)):
-                raise ValueError("Expected primitive, got type {}".format(str(type(val)).strip("<>")))
-            return True
 
-        else:
-            return False
+# Validators of the Edm types, called with a value and the pattern, minimum and maximum of its property
+EDM_VALIDATORS = {
+    "Edm.Boolean": lambda val, pattern, min, max: RedfishProperty.validate_bool(val),
+    "Edm.DateTimeOffset": lambda val, pattern, min, max: RedfishProperty.validate_string(
+        val, r".*(Z|(\+|-)[0-9][0-9]:[0-9][0-9])"),
+    "Edm.Duration": lambda val, pattern, min, max: RedfishProperty.validate_string(
+        val, r"-?P([0-9]+D)?(T([0-9]+H)?([0-9]+M)?([0-9]+(\.[0-9]+)?S)?)?"),
+    "Edm.Guid": lambda val, pattern, min, max: RedfishProperty.validate_string(
+        val, r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"),
+    "Edm.String": lambda val, pattern, min, max: RedfishProperty.validate_string(val, pattern),
+    "Edm.Int16": lambda val, pattern, min, max: RedfishProperty.validate_int(val, min, max),
+    "Edm.Int32": lambda val, pattern, min, max: RedfishProperty.validate_int(val, min, max),
+    "Edm.Int64": lambda val, pattern, min, max: RedfishProperty.validate_int(val, min, max),
+    "Edm.Int": lambda val, pattern, min, max: RedfishProperty.validate_int(val, min, max),
+    "Edm.Decimal": lambda val, pattern, min, max: RedfishProperty.validate_number(val, min, max),
+    "Edm.Double": lambda val, pattern, min, max: RedfishProperty.validate_number(val, min, max),
+    "Edm.Primitive": lambda val, pattern, min, max: RedfishProperty.validate_primitive(val),
+    "Edm.PrimitiveType": lambda val, pattern, min, max: RedfishProperty.validate_primitive(val),
+}
 
 
 class RedfishObject(RedfishProperty):
@@ -788,6 +1254,9 @@ class RedfishObject(RedfishProperty):
     If Populated, can be grabbed for Links
     Can get json representation of type properties with as_json
     """
+    __slots__ = ('properties', 'payload', 'Collection', 'HasValidUri', 'HasValidUriStrict')
+    all_slots = RedfishProperty.__slots__ + __slots__
+
     def __getitem__(self, index):
         return self.properties[index]
 
@@ -800,16 +1269,16 @@ class RedfishObject(RedfishProperty):
     def __init__(self, redfish_type: RedfishType, name="Object", parent=None):
         super().__init__(redfish_type, name, parent)
         self.properties = {}
-        for prop, typ in redfish_type.getProperties().items():
-            try:
-                base, collection = typ.getBaseType()
-                if base == 'complex':
-                    self.properties[prop] = RedfishObject(typ, prop, self)
-                else:
-                    self.properties[prop] = RedfishProperty(typ, prop, self)
-            except MissingSchemaError:
+        # only the resolved skeleton is cached: children are built for each object, as their parent links
+        # feed casting and URI checks, and a missing schema is warned about for each object, in its resource's log
+        for prop, typ, is_complex in redfish_type.getSkeleton():
+            if is_complex:
+                self.properties[prop] = RedfishObject(typ, prop, self)
+            elif is_complex is None:
                 self.properties[prop] = RedfishProperty(REDFISH_ABSENT, prop, self)
                 my_logger.warning('Schema not found for {}'.format(typ))
+            else:
+                self.properties[prop] = RedfishProperty(typ, prop, self)
 
     def populate(self, payload, check=False, casted=False):
         eval_obj = super().populate(payload)
@@ -896,11 +1365,12 @@ class RedfishObject(RedfishProperty):
                             my_limit = parent.Type.Namespace
                     my_type = sub_obj.Type.Type
                     # get type order from bottom up of schema, check if my_type in that schema
-                    for top_ns, schema in reversed(list(sub_obj.Type.catalog.getSchemaDocByClass(my_ns).classes.items())):
-                        if my_type in schema.my_types:
-                            if splitVersionString(top_ns) <= splitVersionString(my_limit):
-                                my_ns = top_ns
-                                break
+                    my_doc = sub_obj.Type.catalog.getSchemaDocByClass(my_ns)
+                    top_ns = my_doc.getCastNamespace(my_type, splitVersionString(my_limit))
+                    if top_ns is not None:
+                        my_ns = top_ns
+                    else:
+                        top_ns = next(iter(my_doc.classes), None)
                     # ISSUE: We can't cast under v1_0_0, get the next best Type
                     if my_ns == my_ns_unversioned:
                         my_ns = top_ns
@@ -924,10 +1394,8 @@ class RedfishObject(RedfishProperty):
                     my_odata_id = my_odata_id.rstrip('/')
 
                 # Initial check if our URI matches our format at all
-                # Setup REGEX...
-                my_uri_regex = "^{}$".format("|".join(my_uris))
-                my_uri_regex = re.sub(URI_ID_REGEX, VALID_ID_REGEX, my_uri_regex)
-                sub_obj.HasValidUri = re.fullmatch(my_uri_regex, my_odata_id) is not None
+                my_uri_matcher = getUriMatcher(tuple(my_uris))
+                sub_obj.HasValidUri = my_uri_matcher.match(my_odata_id)
                 sub_obj.HasValidUriStrict = False
 
                 if 'Resource.Resource' in sub_obj.Type.getTypeTree():
@@ -949,20 +1417,7 @@ class RedfishObject(RedfishProperty):
                         my_id_chain.append( (my_object.Type.Type, my_object.payload.get('Id'), my_odata_split.pop() ))
                         my_object = my_object.parent
 
-                    for my_uri in my_uris:
-                        # regex URI check to confirm which URI 
-                        my_uri_regex = re.sub(URI_ID_REGEX, VALID_ID_REGEX, "^{}$".format(my_uri))
-                        if re.fullmatch(my_uri_regex, my_odata_id):
-                            sub_obj.HasValidUriStrict = True
-                            # pair our uri pieces with their types
-                            for section, rsc in zip(my_uri.split('/')[::-1], my_id_chain):
-                                if re.match(URI_ID_REGEX, section):
-                                    rsc_type, rsc_value, odata_value = rsc
-                                    my_str = re.sub('\{|Id\}|', '', section)
-                                    sub_obj.HasValidUriStrict = sub_obj.HasValidUriStrict and rsc_type == my_str and rsc_value == odata_value
-
-                            if sub_obj.HasValidUriStrict:
-                                break
+                    sub_obj.HasValidUriStrict = my_uri_matcher.matchStrict(my_odata_id, my_id_chain)
 
             # TODO: Oem support is able, but it is tempermental for Actions and Additional properties
             #if 'Resource.OemObject' in sub_obj.Type.getTypeTree():
@@ -990,16 +1445,15 @@ class RedfishObject(RedfishProperty):
                 my_property_names = [x for x in sub_payload if x not in sub_obj.properties if re.match(prop_pattern, x) and '@' not in x]
                 for add_name in my_property_names:
                     if 'Edm.' in my_odata_type:
-                        my_new_term = '<Term Name="{}" Type="{}"> </Term>'.format(add_name, my_odata_type) # Make a pseudo tag because RedfishType requires it...
-                        new_soup = BeautifulSoup(my_new_term, "xml").find('Term')
-                        type_obj = RedfishType(new_soup, sub_obj.Type.owner)
+                        type_obj = sub_obj.Type.owner.getDynamicPropertyType(my_odata_type)
                     else:
                         type_obj = sub_obj.Type.catalog.getSchemaDocByClass(my_odata_type).getTypeInSchemaDoc(my_odata_type)
                     if type_obj.getBaseType()[0] == 'complex':
                         object = RedfishObject(type_obj, name=add_name, parent=self)
                     else:
                         object = RedfishProperty(type_obj, name=add_name, parent=self)
-                    my_logger.debug('Populated {} with {}'.format(my_property_names, object.as_json()))
+                    if my_logger.isEnabledFor(logging.DEBUG):
+                        my_logger.debug('Populated {} with {}'.format(my_property_names, object.as_json()))
                     my_logger.verbose1(('Adding Additional', add_name, my_odata_type, sub_obj.Type))
                     sub_obj.properties[add_name] = object.populate(sub_payload.get(add_name, REDFISH_ABSENT))
 
@@ -4,8 +4,11 @@
 
 import re
 import logging
+from functools import lru_cache
 from types import SimpleNamespace
 
+import requests
+
 my_logger = logging.getLogger()
 my_logger.setLevel(logging.DEBUG)
 
@@ -27,6 +30,23 @@ def create_entry(name, value, type, exists, result):
     })
 
 
+def create_session(pool_size=10):
+    """
+    Create a session with keep-alive connections for requests outside the service, such as schema files
+
+    Pass proxies to each request, proxies of the environment take precedence over those of a session
+
+    :param pool_size: number of connections kept per host
+    :return: requests.Session
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+@lru_cache(maxsize=1024)
 def splitVersionString(v_string):
     """
     Split x.y.z and Namespace.vX_Y_Z, vX_Y_Z type version strings into tuples of integers
@@ -83,6 +103,7 @@ def getNamespace(string: str):
     return string.rsplit('.', 1)[0]
 
 
+@lru_cache(maxsize=1024)
 def getVersion(string: str):
     """getVersion
 
@@ -0,0 +1,127 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+import json
+import os
+import tarfile
+import threading
+import zipfile
+
+import logging
+my_logger = logging.getLogger(__name__)
+
+
+def getMockupKey(path):
+    """
+    Get the directory of the mockup holding the index.json of a URI path, relative to the mockup
+
+    :return: directory with '/' separators, '' for the top of the mockup
+    """
+    return path.replace('/redfish/v1/', '', 1).strip('/')
+
+
+class MockupIndex():
+    """
+    Index of the index.json files of a mockup directory, zip or tar archive, built once
+
+    Files are read and parsed the first time they are requested, then kept as text
+    """
+    def __init__(self, location):
+        self.location = location
+        self.archive = None
+        self.files = {}
+        self.contents = {}
+        self.lock = threading.Lock()
+        if os.path.isdir(location):
+            for dirpath, dirnames, filenames in os.walk(location):
+                if 'index.json' in filenames:
+                    key = os.path.relpath(dirpath, location).replace(os.sep, '/')
+                    self.files['' if key == '.' else key] = os.path.join(dirpath, 'index.json')
+        elif zipfile.is_zipfile(location):
+            self.archive = zipfile.ZipFile(location)
+            self._indexArchive(self.archive.namelist())
+        elif os.path.isfile(location) and tarfile.is_tarfile(location):
+            self.archive = tarfile.open(location)
+            self._indexArchive([x.name for x in self.archive.getmembers() if x.isfile()])
+        else:
+            my_logger.error('Mockup {} is not a directory, zip or tar archive'.format(location))
+        my_logger.info('Mockup {} has {} resources'.format(location, len(self.files)))
+
+    def _indexArchive(self, names):
+        keys = {}
+        for name in names:
+            path = name.replace('\\', '/')
+            path = path[2:] if path.startswith('./') else path
+            if path == 'index.json' or path.endswith('/index.json'):
+                keys[path[:-len('index.json')].strip('/')] = name
+        # an archive of a mockup directory holds everything under that directory
+        wrapper = self._getWrapper(keys)
+        if wrapper:
+            keys = {x[len(wrapper):].strip('/'): y for x, y in keys.items()}
+        self.files = keys
+
+    def _getWrapper(self, keys):
+        """
+        Get the directory of an archive that holds the service root, when it is not the top of the archive
+
+        Partial mockups, such as one holding only Chassis/1 and Chassis/2, are left as they are
+
+        :return: directory with '/' separators, '' for the top of the archive
+        """
+        if '' in keys:
+            return ''
+        # a redfish/v1 directory holding every resource
+        for key in keys:
+            parts = key.split('/')
+            for index in range(len(parts) - 1):
+                if parts[index:index + 2] == ['redfish', 'v1']:
+                    wrapper = '/'.join(parts[:index + 2])
+                    if all(x == wrapper or x.startswith(wrapper + '/') for x in keys):
+                        return wrapper
+                    break
+        # a single top directory, whose index.json is the service root
+        tops = set(x.split('/', 1)[0] for x in keys)
+        if len(tops) == 1 and next(iter(tops)) in keys:
+            top = tops.pop()
+            try:
+                payload = json.loads(self._read(keys[top]))
+            except Exception as e:
+                my_logger.debug('Could not read {} of mockup {}: {}'.format(keys[top], self.location, repr(e)))
+                return ''
+            odata_id = payload.get('@odata.id') if isinstance(payload, dict) else None
+            if odata_id is None or odata_id.rstrip('/') == '/redfish/v1':
+                return top
+        return ''
+
+    def __contains__(self, path):
+        return getMockupKey(path) in self.files
+
+    def __len__(self):
+        return len(self.files)
+
+    def get(self, path):
+        """
+        Get the payload of the mockup for a URI path
+
+        :return: JSON text, or None if the mockup does not hold the URI
+        """
+        key = getMockupKey(path)
+        if key not in self.files:
+            return None
+        with self.lock:
+            if key not in self.contents:
+                self.contents[key] = json.dumps(json.loads(self._read(self.files[key])))
+            return self.contents[key]
+
+    def _read(self, name):
+        if self.archive is None:
+            with open(name, 'rb') as mockup_file:
+                return mockup_file.read().decode('utf-8-sig')
+        if isinstance(self.archive, zipfile.ZipFile):
+            return self.archive.read(name).decode('utf-8-sig')
+        return self.archive.extractfile(name).read().decode('utf-8-sig')
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
@@ -7,7 +7,8 @@ import os
 import logging
 from io import BytesIO
 import zipfile
-import requests
+
+from redfish_service_validator.helper import create_session
 
 # live_zip_uri = 'http://redfish.dmtf.org/schemas/DSP8010_2021.1.zip'
 live_zip_uri = 'https://www.dmtf.org/sites/default/files/standards/documents/DSP8010.zip' 
@@ -20,13 +21,14 @@ def setup_schema_pack(uri, local_dir, http_proxy='', https_proxy=''):
         proxies = {}
         if http_proxy != '': proxies['http'] = http_proxy
         if https_proxy != '': proxies['https'] = https_proxy
+    session = create_session()
     if uri == 'latest':
         uri = live_zip_uri
     my_logger.info('Unpacking schema pack... {}'.format(uri))
     try:
         if not os.path.isdir(local_dir):
             os.makedirs(local_dir)
-        response = requests.get(uri, timeout=timeout, proxies=proxies)
+        response = session.get(uri, timeout=timeout, proxies=proxies)
         expCode = [200]
         elapsed = response.elapsed.total_seconds()
         statusCode = response.status_code
@@ -51,6 +53,7 @@ def setup_schema_pack(uri, local_dir, http_proxy='', https_proxy=''):
     except Exception as ex:
         my_logger.error("A problem when getting resource has occurred {}".format(uri))
         my_logger.warning("output: ", exc_info=True)
+    session.close()
     return True
 
 
@@ -0,0 +1,130 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+import asyncio
+import random
+import threading
+import time
+
+
+class AdaptiveLimiter():
+    """
+    Additive increase, multiplicative decrease limit on the requests in flight to a target
+
+    The limit grows by one for each window of requests answered without a spike in latency,
+    and is cut by backoff on a server error, a failed request, or a response slower than spike_ratio times the usual latency
+    """
+    def __init__(self, max_limit, min_limit=1, backoff=0.5, spike_ratio=3.0):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.backoff = backoff
+        self.spike_ratio = spike_ratio
+        self.limit = float(min_limit)
+        self.in_flight = 0
+        self.latency = None
+        self.increases, self.decreases = 0, 0
+        self.condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+        return False
+
+    def update(self, elapsed, ok):
+        """
+        Adjust the limit from the outcome of a request
+
+        :param elapsed: seconds taken by the request
+        :param ok: False for server errors and failed requests
+        """
+        spike = self.latency is not None and elapsed > self.spike_ratio * max(self.latency, 0.01)
+        if not ok or spike:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self.decreases += 1
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.increases += 1
+            # usual latency is only learned from requests that did not spike
+            self.latency = elapsed if self.latency is None else 0.9 * self.latency + 0.1 * elapsed
+
+    def __repr__(self):
+        return 'AdaptiveLimiter(limit={:.1f}, max_limit={}, latency={}, increases={}, decreases={})'.format(
+            self.limit, self.max_limit, None if self.latency is None else round(self.latency, 3), self.increases, self.decreases)
+
+
+class CircuitOpenError(Exception):
+    """Exception used when requests to a target are paused by its circuit breaker"""
+    def __init__(self, msg=None):
+        super(CircuitOpenError, self).__init__(msg)
+
+
+class CircuitBreaker():
+    """
+    Pauses requests to a target after threshold consecutive requests fail to get any response
+
+    While open, requests fail immediately; after cooldown seconds a single trial request is let through,
+    which closes the breaker on success or opens it again on failure
+    """
+    def __init__(self, target, threshold=5, cooldown=30.0):
+        self.target = target
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened = None
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def check(self):
+        """
+        Raise CircuitOpenError if requests to the target are paused
+        """
+        with self.lock:
+            if self.opened is None:
+                return
+            remaining = self.cooldown - (time.monotonic() - self.opened)
+            if remaining > 0:
+                raise CircuitOpenError('Requests to {} are paused for {:.0f} seconds after {} consecutive failures'.format(
+                    self.target, remaining, self.failures))
+            # let one trial request through, the rest wait for another cooldown
+            self.opened = time.monotonic()
+
+    def success(self):
+        with self.lock:
+            self.failures, self.opened = 0, None
+
+    def failure(self):
+        """
+        Record a request that got no response
+
+        :return: True if this failure opened the breaker
+        """
+        with self.lock:
+            self.failures += 1
+            if self.failures < self.threshold:
+                return False
+            tripped = self.opened is None
+            self.opened = time.monotonic()
+            if tripped:
+                self.trips += 1
+            return tripped
+
+
+def getRetryDelay(attempt, retry_after=None, base=0.5, cap=8.0):
+    """
+    Get the delay before a retry, exponential in the attempt number with full jitter
+
+    A numeric Retry-After header from the service is honored, up to 30 seconds
+
+    :return: seconds
+    """
+    if retry_after is not None and str(retry_after).strip().isdigit():
+        return min(float(retry_after), 30.0)
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
@@ -104,6 +104,7 @@ def renderHtml(results, tool_version, startTick, nowTick, service):
     error_lines, finalCounts = count_errors(results)
     if service.metadata is not None:
         finalCounts.update(service.metadata.get_counter())
+    finalCounts.update(service.get_counter())
 
     # wrap html
     htmlPage = ''
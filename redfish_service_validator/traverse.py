@@ -2,23 +2,32 @@
 # Copyright 2016-2020 DMTF. All rights reserved.
 # License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
 
+import asyncio
 import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from functools import lru_cache
 from urllib.parse import urlparse, urlunparse
 from http.client import responses
-import os
 
 import redfish as rf
-import requests
 import redfish_service_validator.catalog as catalog
-from redfish_service_validator.helper import navigateJsonFragment, splitVersionString
+from redfish_service_validator.cache import ResponseCache
+from redfish_service_validator.cassette import Cassette
+from redfish_service_validator.mockup import MockupIndex
+from redfish_service_validator.throttle import AdaptiveLimiter, CircuitBreaker, getRetryDelay
+from redfish_service_validator.helper import navigateJsonFragment, splitVersionString, create_session
 from redfish_service_validator.metadata import Metadata
 
 import logging
 my_logger = logging.getLogger(__name__)
 traverseLogger = my_logger
 
+# statuses of GET requests worth retrying
+RETRY_STATUSES = [408, 429, 500, 502, 503, 504]
+
 # dictionary to hold sampling notation strings for URIs
 class AuthenticationError(Exception):
     """Exception used for failed basic auth or token auth"""
@@ -61,8 +70,42 @@ class rfService():
             self.ext_proxies = {}
             if self.config['ext_http_proxy'] != '': self.ext_proxies['http'] = self.config['ext_http_proxy']
             if self.config['ext_https_proxy'] != '': self.ext_proxies['https'] = self.config['ext_https_proxy']
-        self.context = rf.redfish_client(base_url=rhost, username=user, password=passwd, timeout=self.config['timeout'], proxies=proxies)
-        self.context.login( auth = self.config['authtype'].lower() )
+        # Requests outside the service share pooled connections, and time out like those to the service
+        self.ext_session = create_session(max(int(self.config.get('workers', 1)), 10))
+
+        # Resources of the mockup replace those of the service
+        self.mockup = MockupIndex(self.config['mockup']) if self.config.get('mockup') else None
+
+        # Responses are written to the record directory, or read from the replay directory without contacting the service
+        self.recorder = Cassette(self.config['record']) if self.config.get('record') else None
+        self.player = Cassette(self.config['replay']) if self.config.get('replay') else None
+        if self.player is not None:
+            traverseLogger.info('Replaying responses recorded in {}'.format(self.config['replay']))
+            self.context = None
+        else:
+            self.context = rf.redfish_client(base_url=rhost, username=user, password=passwd, timeout=self.config['timeout'], proxies=proxies)
+            self.context.login( auth = self.config['authtype'].lower() )
+
+        # Event loop for fetching resources ahead of validation, serial when workers is 1
+        # workers also bounds the adaptive number of requests in flight to each target
+        self.workers = max(int(self.config.get('workers', 1)), 1)
+        self.executor, self.loop = None, None
+        if self.workers > 1:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+            self.loop = asyncio.new_event_loop()
+            self.loop.set_default_executor(self.executor)
+            threading.Thread(target=self._runLoop, name='rfServiceLoop', daemon=True).start()
+        self.limits, self.pending, self.inflight, self.requested = {}, {}, {}, set()
+        self.fragment_errors = set()
+        self.pending_lock = threading.Lock()
+        self.counter = Counter()
+
+        # Failed requests are retried, and a target that stops responding is paused by its circuit breaker
+        self.retries = max(int(self.config.get('retries', 0)), 0)
+        self.breakers, self.counter_lock = {}, threading.Lock()
+
+        # Responses are kept up to cache_size MiB, spilling to cache_directory beyond that when given
+        self.cache = ResponseCache(int(self.config.get('cache_size', 256)) * 1024 * 1024, self.config.get('cache_directory'))
 
         # Go through $metadata and download any additional schema files needed
         success, data, response, delay = self.callResourceURI(Metadata.metadata_uri)
@@ -71,8 +114,8 @@ class rfService():
         else:
             self.metadata = Metadata(None, self, my_logger)
 
-        # Build the data model based on cached schema files
-        self.catalog = catalog.SchemaCatalog(self.config['metadatafilepath'])
+        # Build the data model based on cached schema files, compiled once per set of schema files
+        self.catalog = catalog.SchemaCatalog(self.config['metadatafilepath'], compiled=True)
 
         target_version = 'n/a'
 
@@ -97,29 +140,419 @@ class rfService():
         
         self.service_root = data
 
+        # Collections are requested with $expand when enabled and supported, to cache their members in one request
+        expand_query = (data or {}).get('ProtocolFeaturesSupported', {}).get('ExpandQuery', {})
+        self.expand = self.config.get('expand') in [True, 'True', 'true']
+        if self.expand and not (isinstance(expand_query, dict) and expand_query.get('NoLinks') and expand_query.get('Levels')):
+            traverseLogger.warning('Service does not support $expand with levels of non-link properties, collections will not be expanded')
+            self.expand = False
+
+        # Members past the first page of a collection are requested page by page
+        self.page_size = max(int(self.config.get('page_size', 0)), 0)
+        self.top_skip = (data or {}).get('ProtocolFeaturesSupported', {}).get('TopSkipQuery') is True
+
         self.active = True
 
 
+    def _runLoop(self):
+        self.loop.run_forever()
+        self.loop.close()
+
     def close(self):
         self.active = False
+        for (loop, target), limiter in self.limits.items():
+            traverseLogger.debug('Concurrency for {}: {}'.format(target or 'service', limiter))
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        with self.pending_lock:
+            self.pending.clear()
+        if self.mockup is not None:
+            self.mockup.close()
+        self.ext_session.close()
+
+    def prefetchResourceURIs(self, URILinks):
+        """
+        Starts fetching the given URIs on the worker pool
+
+        JSON resources are moved into the response cache as they arrive, other responses are held
+        until callResourceURI asks for them, so validation order and its messages are unaffected.
+        URIs that were requested before are left to callResourceURI and its cache.
+
+        param arg1: list of URIs to be requested soon
+        """
+        if self.loop is None:
+            return
+        for URILink in URILinks:
+            URILink = URILink.rsplit('#', 1)[0] if URILink is not None else None
+            if URILink is None or URILink in self.requested:
+                continue
+            self.requested.add(URILink)
+            with self.pending_lock:
+                self.pending[URILink] = future = asyncio.run_coroutine_threadsafe(self._fetchResourceAsync(URILink), self.loop)
+            future.add_done_callback(lambda done, URILink=URILink: self._cachePrefetched(URILink, done))
+
+    def _cachePrefetched(self, URILink, future):
+        """
+        Moves a finished prefetch of a JSON resource from pending into the response cache, bounded by its size
+
+        Runs on the event loop or a worker thread, so the payload is decoded with json.loads, which does not log.
+        Only JSON responses with status 200 that decode are moved, the rest wait for callResourceURI
+        to interpret them, and log their errors, while their resource is validated
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        response, elapsed = future.result()
+        if response.status != 200 or 'application/json' not in (response.getheader('content-type') or ''):
+            return
+        try:
+            decoded = json.loads(response.text)
+        except Exception:
+            return
+        with self.pending_lock:
+            if self.pending.get(URILink) is future:
+                self.cache.put(URILink, (decoded is not None, decoded, response, elapsed))
+                del self.pending[URILink]
+
+    def _popPending(self, URILink):
+        """
+        Takes the prefetch of a URI that is still pending
+
+        return: (future, cached result), either None
+        """
+        with self.pending_lock:
+            future = self.pending.pop(URILink, None)
+            if future is None and URILink in self.cache:
+                return None, self.cache.get(URILink)
+        return future, None
+
+    async def _fetchResourceAsync(self, URILink):
+        """
+        Performs the request for a URI or URL on the running event loop
+
+        Requests in flight to each target are limited adaptively up to workers, the rest wait here without holding a thread
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (response, elapsed)
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, urlparse(URILink).netloc)
+        if key not in self.limits:
+            self.limits[key] = AdaptiveLimiter(self.workers)
+        limiter = self.limits[key]
+        async with limiter:
+            startTick = datetime.now()
+            try:
+                response, elapsed = await loop.run_in_executor(None, self._fetchResource, URILink)
+            except Exception:
+                limiter.update((datetime.now() - startTick).total_seconds(), False)
+                raise
+            limiter.update((datetime.now() - startTick).total_seconds(), response.status < 500)
+            return response, elapsed
+
+    def _count(self, key):
+        with self.counter_lock:
+            self.counter[key] += 1
+
+    def _fetchResource(self, URILink):
+        """
+        Performs the request for a URI or URL, without interpreting the response
+
+        Retries with backoff on failed requests and retryable statuses, and records the final response
+        Runs on worker threads, so nothing above DEBUG is logged here; errors are raised to the caller
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (response, elapsed)
+        """
+        if self.player is not None:
+            # resources of the mockup replace recorded ones, as they replace those of the service
+            mocked = self._getMockupResource(URILink)
+            return mocked if mocked is not None else self.player.play(URILink)
+
+        target = urlparse(URILink).netloc
+        with self.counter_lock:
+            if target not in self.breakers:
+                self.breakers[target] = CircuitBreaker(target or self.config['configuri'])
+            breaker = self.breakers[target]
+        breaker.check()
+
+        attempt = 0
+        while True:
+            try:
+                response, elapsed = self._requestResource(URILink)
+                error = None
+            except Exception as e:
+                response, error = None, e
+            if attempt >= self.retries or (error is None and response.status not in RETRY_STATUSES):
+                break
+            attempt += 1
+            self._count('retries')
+            delay = getRetryDelay(attempt, response.getheader('Retry-After') if response is not None else None)
+            traverseLogger.debug('Retrying {} in {:.2f} seconds, attempt {}: {}'.format(
+                URILink, delay, attempt, repr(error) if error is not None else response.status))
+            time.sleep(delay)
+
+        if error is not None:
+            if breaker.failure():
+                self._count('circuitBreakerTrips')
+            raise error
+        breaker.success()
+
+        if self.recorder is not None:
+            self.recorder.record(URILink, response, elapsed)
+        return response, elapsed
+
+    def _requestResource(self, URILink):
+        """
+        Performs a single request for a URI or URL, from the mockup, the service, or outside the service
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (response, elapsed)
+        """
+        scheme, netloc, path, params, query, fragment = urlparse(URILink)
+        inService = scheme == '' and netloc == ''
+        if inService:
+            URLDest = urlunparse((scheme, netloc, path, '', query, '')) #URILink
+        else:
+            URLDest = urlunparse((scheme, netloc, path, params, query, fragment))
+
+        headers = {"Accept-Encoding": "*"}
+
+        mocked = self._getMockupResource(URILink)
+        if mocked is not None:
+            return mocked
+
+        startTick = datetime.now()
+        if not inService:
+            req = self.ext_session.get(URLDest, timeout=self.config['timeout'], proxies=self.ext_proxies)
+            response = rf.rest.v1.StaticRestResponse(Status=req.status_code, Headers={x:req.headers[x] for x in req.headers}, Content=req.text)
+        else:
+            response = self.context.get(URLDest, headers=headers)
+        elapsed = datetime.now() - startTick
+        return response, elapsed
+
+    def _getMockupResource(self, URILink):
+        """
+        Gets the resource of the mockup replacing a URI of the service
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (response, elapsed), or None if the mockup does not hold the URI
+        """
+        scheme, netloc, path, params, query, fragment = urlparse(URILink)
+        if self.mockup is None or scheme != '' or netloc != '' or path not in self.mockup:
+            return None
+        startTick = datetime.now()
+        content = self.mockup.get(path)
+        response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json', 'X-Redfish-Mockup': 'true'}, Content=content)
+        return response, datetime.now() - startTick
 
-    @lru_cache(maxsize=128)
     def callResourceURI(self, URILink):
-        traverseLogger = my_logger
         """
         Makes a call to a given URI or URL
 
         param arg1: path to URI "/example/1", or URL "http://example.com"
-        return: (success boolean, data, request status code)
+        return: (success boolean, data, response, elapsed)
+        """
+        if URILink is None:
+            traverseLogger.warning("This URI is empty!")
+            return False, None, None, 0
+
+        # fragments are served from the cached document they point into
+        base_uri = URILink.rsplit('#', 1)[0]
+        if base_uri != URILink:
+            self._countFragment(URILink, base_uri)
+            return self._resolveFragment(URILink, self.callResourceURI(base_uri))
+
+        cached = self.cache.get(URILink)
+        if cached is not None:
+            return cached
+
+        self.requested.add(URILink)
+        future, cached = self._popPending(URILink)
+        if cached is not None:
+            return cached
+        try:
+            fetched = future.result() if future is not None else self._fetchResource(URILink)
+        except Exception as e:
+            fetched = e
+        result = self._interpretResponse(URILink, fetched)
+        self.cache.put(URILink, result)
+        return result
+
+    async def callResourceURIAsync(self, URILink):
+        """
+        Makes a call to a given URI or URL from a coroutine, for callers overlapping many requests
+
+        Requests in flight to each target are limited adaptively, up to the workers option,
+        and concurrent calls for a URI on one event loop share a single request
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (success boolean, data, response, elapsed)
         """
-        # rs-assertions: 6.4.1, including accept, content-type and odata-versions
-        # rs-assertion: handle redirects?  and target permissions
-        # rs-assertion: require no auth for serviceroot calls
-        # TODO: Written with "success" values, should replace with Exception and catches
         if URILink is None:
             traverseLogger.warning("This URI is empty!")
             return False, None, None, 0
 
+        # fragments are served from the cached document they point into
+        base_uri = URILink.rsplit('#', 1)[0]
+        if base_uri != URILink:
+            self._countFragment(URILink, base_uri)
+            return self._resolveFragment(URILink, await self.callResourceURIAsync(base_uri))
+
+        cached = self.cache.get(URILink)
+        if cached is not None:
+            return cached
+
+        key = (asyncio.get_running_loop(), URILink)
+        if key not in self.inflight:
+            self.inflight[key] = task = asyncio.ensure_future(self._callResourceURIAsync(URILink))
+            task.add_done_callback(lambda done: self.inflight.pop(key, None))
+        # a caller that is cancelled leaves the request to the others waiting for it
+        return await asyncio.shield(self.inflight[key])
+
+    async def _callResourceURIAsync(self, URILink):
+        """
+        Requests a URI or URL that is not cached, for callResourceURIAsync
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (success boolean, data, response, elapsed)
+        """
+        self.requested.add(URILink)
+        future, cached = self._popPending(URILink)
+        if cached is not None:
+            return cached
+        try:
+            if future is not None:
+                fetched = await asyncio.wrap_future(future)
+            else:
+                fetched = await self._fetchResourceAsync(URILink)
+        except Exception as e:
+            fetched = e
+        result = self._interpretResponse(URILink, fetched)
+        self.cache.put(URILink, result)
+        return result
+
+    def expandCollection(self, URILink, payload, limit=0):
+        """
+        Requests a collection with $expand and caches the payloads of its members, so they are not requested one by one
+
+        Collections validated only up to limit members are expanded with $top, or not at all when the service does not support it
+
+        param arg1: URI of the collection
+        param arg2: payload of the collection
+        param arg3: number of members that will be validated, 0 for all members
+        return: number of members cached
+        """
+        members = payload.get('Members') if isinstance(payload, dict) else None
+        if not self.expand or '?' in URILink or '#' in URILink or not isinstance(members, list):
+            return 0
+        query = '?$expand=.($levels=1)'
+        if limit and len(members) > limit:
+            if not self.top_skip:
+                return 0
+            members, query = members[:limit], query + '&$top={}'.format(limit)
+        member_uris = [x.get('@odata.id') for x in members if isinstance(x, dict)]
+        member_uris = [x for x in member_uris if isinstance(x, str) and x not in self.requested and x not in self.cache]
+        if len(member_uris) == 0:
+            return 0
+
+        success, data, response, elapsed = self.callResourceURI(URILink + query)
+        if not success or not isinstance(data, dict) or not isinstance(data.get('Members'), list):
+            return 0
+        seeded = 0
+        headers = {x: y for x, y in response.getheaders() if x.lower() in ['content-type', 'odata-version']}
+        for member in data['Members']:
+            # members that were not expanded only hold @odata.id
+            if not isinstance(member, dict) or member.get('@odata.id') not in member_uris or len(member) < 2:
+                continue
+            member_response = rf.rest.v1.StaticRestResponse(Status=response.status, Headers=headers, Content=member)
+            self.cache.put(member['@odata.id'], (True, member, member_response, elapsed))
+            self.requested.add(member['@odata.id'])
+            seeded += 1
+        self.counter['expandedMembers'] += seeded
+        return seeded
+
+    def getCollectionPages(self, URILink, payload):
+        """
+        Yields the members of the pages of a collection that follow its payload, requesting each page when it is needed
+
+        Follows Members@odata.nextLink, or uses $skip and $top with page_size when the service supports them
+        and reports more members in Members@odata.count than it returned
+
+        param arg1: URI of the collection
+        param arg2: payload of the first page of the collection
+        """
+        fetched = len(payload.get('Members', []))
+        total = payload.get('Members@odata.count')
+        next_link = payload.get('Members@odata.nextLink')
+        pages = {URILink}
+        while True:
+            if isinstance(next_link, str):
+                page_uri = next_link
+            elif self.top_skip and self.page_size > 0 and isinstance(total, int) and fetched < total and '?' not in URILink:
+                page_uri = '{}?$skip={}&$top={}'.format(URILink, fetched, self.page_size)
+            else:
+                return
+            if page_uri in pages:
+                traverseLogger.error('Members@odata.nextLink of collection {} refers to a page already fetched: {}'.format(URILink, page_uri))
+                return
+            pages.add(page_uri)
+            success, page, response, elapsed = self.callResourceURI(page_uri)
+            if not success or not isinstance(page, dict) or not isinstance(page.get('Members'), list) or len(page['Members']) == 0:
+                traverseLogger.error('Could not get the page of collection {}: {}'.format(URILink, page_uri))
+                return
+            fetched += len(page['Members'])
+            next_link = page.get('Members@odata.nextLink')
+            yield page['Members']
+
+    def _countFragment(self, URILink, base_uri):
+        """
+        Counts a fetch saved when a new fragment is requested from a document that is already cached
+        """
+        if URILink not in self.requested and base_uri in self.cache:
+            self.counter['fragmentFetchesSaved'] += 1
+        self.requested.add(URILink)
+
+    def _resolveFragment(self, URILink, result):
+        """
+        Navigates the JSON pointer in the fragment of a URI, from the result of its base document
+
+        A pointer that does not resolve is remembered, so it is reported once for each URI, as when results were cached by URI
+
+        return: (success boolean, data, response, elapsed)
+        """
+        success, decoded, response, elapsed = result
+        if not success or not isinstance(decoded, (dict, list)):
+            return result
+        if URILink in self.fragment_errors:
+            return False, None, response, elapsed
+        decoded = navigateJsonFragment(decoded, URILink)
+        if decoded is None:
+            self.fragment_errors.add(URILink)
+            traverseLogger.error(
+                    "The JSON pointer in the fragment of this URI is not constructed properly: {}".format(URILink))
+        return decoded is not None, decoded, response, elapsed
+
+    def get_counter(self):
+        """
+        Create a Counter instance containing the counts of requests to the service
+        """
+        return Counter(self.counter)
+
+    def _interpretResponse(self, URILink, fetched):
+        traverseLogger = my_logger
+        """
+        Decodes the response of a call to a given URI or URL
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        param arg2: (response, elapsed) from _fetchResource, or the exception it raised
+        return: (success boolean, data, response, elapsed)
+        """
+        # rs-assertions: 6.4.1, including accept, content-type and odata-versions
+        # rs-assertion: handle redirects?  and target permissions
+        # rs-assertion: require no auth for serviceroot calls
+        # TODO: Written with "success" values, should replace with Exception and catches
         config = self.config
         # proxies = self.proxies
         ConfigIP, UseSSL, AuthType, ChkCert, ChkCertBundle, timeout, Token = config['configuri'], config['usessl'], config['authtype'], \
@@ -127,10 +560,6 @@ class rfService():
 
         scheme, netloc, path, params, query, fragment = urlparse(URILink)
         inService = scheme == '' and netloc == ''
-        if inService:
-            URLDest = urlunparse((scheme, netloc, path, '', '', '')) #URILink
-        else:
-            URLDest = urlunparse((scheme, netloc, path, params, query, fragment))
 
         payload, statusCode, elapsed, auth, noauthchk = None, '', 0, None, True
 
@@ -162,20 +591,9 @@ class rfService():
             'out of service ' if not inService else '', AuthType, UseSSL, URILink, headers))
         response = None
         try:
-            startTick = datetime.now()
-            mockup_file_path = os.path.join(config['mockup'], URLDest.replace('/redfish/v1/', '', 1).strip('/'), 'index.json')
-            if not inService:
-                req = requests.get(URLDest, proxies=self.ext_proxies)
-                content = req.json if not isXML else req.text
-                response = rf.rest.v1.StaticRestResponse(Status=req.status_code, Headers={x:req.headers[x] for x in req.headers}, Content=req.text)
-            elif config['mockup'] != '' and os.path.isfile(mockup_file_path):
-                content = {}
-                with open(mockup_file_path) as mockup_file:
-                    content = json.load(mockup_file)
-                response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json', 'X-Redfish-Mockup': 'true'}, Content=content)
-            else:
-                response = self.context.get(URLDest, headers=headers)
-            elapsed = datetime.now() - startTick
+            if isinstance(fetched, Exception):
+                raise fetched
+            response, elapsed = fetched
             statusCode = response.status
 
             traverseLogger.debug('{}, {},\nTIME ELAPSED: {}'.format(statusCode, response.getheaders(), elapsed))
@@ -187,12 +605,6 @@ class rfService():
                 if 'application/json' in contenttype:
                     traverseLogger.debug("This is a JSON response")
                     decoded = response.dict
-                            
-                    # navigate fragment
-                    decoded = navigateJsonFragment(decoded, URILink)
-                    if decoded is None:
-                        traverseLogger.error(
-                                "The JSON pointer in the fragment of this URI is not constructed properly: {}".format(URILink))
                 elif 'application/xml' in contenttype:
                     decoded = response.text
                 elif 'text/xml' in contenttype:
@@ -49,8 +49,9 @@ def validateAction(act_name, actionDecoded, all_actions):
     if act_type not in all_actions:
         actionCounts['errorActionBadName'] += 1
     else:
-        my_act = all_actions[act_type]
-        actOptional = my_act.find('annotation', {'term': 'Redfish.Required'}) is not None
+        # Redfish.Required is not consulted: the earlier lookup searched lowercase names that never matched CSDL,
+        # so every action, present or absent, was treated as mandatory, and that behavior is kept deliberately
+        actOptional = False
         if actionDecoded == REDFISH_ABSENT:
             if actOptional:
                 actPass = True
@@ -205,7 +206,7 @@ def validateComplex(service, sub_obj, prop_name, oem_check=True):
                 subCounts['unverifiedAdditional.complex'] += 1
                 subMsgs[key] = (displayValue(item), '-', '-', 'FAIL')
             
-            fuzz = get_fuzzy_property(key, sub_obj.properties)
+            fuzz = get_fuzzy_property(key, sub_obj.properties, type_obj=sub_obj.Type)
             if fuzz != key and fuzz in sub_obj.properties:
                 subMsgs[fuzz] = ('-', '-', '-', 'INVALID')
                 my_logger.error('Attempting {} (from {})?'.format(fuzz, key))
@@ -381,10 +382,12 @@ def checkPropertyConformance(service, prop_name, prop, parent_name=None, parent_
         counts['skipOem'] += 1
         return {prop_name: ('-', '-', 'Yes' if prop.Exists else 'No', 'OEM')}, counts
 
+    facts = prop.Type.getPropertyFacts()
+
     # Parameter Passes
     paramPass = propMandatoryPass = propNullablePass = deprecatedPass = nullValid = True
 
-    if prop.Type.IsMandatory:
+    if facts.mandatory:
         propMandatoryPass = True if prop.Exists else False
         my_logger.verbose1("\tMandatory Test: {}".format('OK' if propMandatoryPass else 'FAIL'))
     else:
@@ -394,28 +397,15 @@ def checkPropertyConformance(service, prop_name, prop, parent_name=None, parent_
             counts['skipOptional'] += 1
             return {prop_name: ( '-', displayType(prop.Type), 'Yes' if prop.Exists else 'No', 'Optional')}, counts
 
-    # <Annotation Term="Redfish.Deprecated" String="This property has been Deprecated in favor of Thermal.v1_1_0.Thermal.Fan.Name"/>
-    if prop.Type.Deprecated is not None and not prop.Type.IsMandatory:
+    for deprecation in facts.deprecations:
         deprecatedPass = False
         counts['warnDeprecated'] += 1
-        my_logger.warning('{}: The given property is deprecated: {}'.format(prop_name, prop.Type.Deprecated.get('String', '')))
-
-    if prop.Type.Revisions is not None:
-        for tag_item in prop.Type.Revisions:
-            revision_tag = tag_item.find('PropertyValue', attrs={ 'EnumMember': 'Redfish.RevisionKind/Deprecated', 'Property': 'Kind'})
-            if revision_tag and not prop.Type.IsMandatory:
-                desc_tag = tag_item.find('PropertyValue', attrs={'Property': 'Description'})
-                deprecatedPass = False
-                counts['warnDeprecated'] += 1
-                if desc_tag:
-                    my_logger.warning('{}: The given property is deprecated: {}'.format(prop_name, desc_tag.attrs.get('String', '')))
-                else:
-                    my_logger.warning('{}: The given property is deprecated'.format(prop_name))
+        my_logger.warning('{}: {}'.format(prop_name, deprecation))
 
     # Note: consider http://docs.oasis-open.org/odata/odata-csdl-xml/v4.01/csprd01/odata-csdl-xml-v4.01-csprd01.html#_Toc472333112
     # Note: make sure it checks each one
     # propCollectionType = PropertyDict.get('isCollection')
-    propRealType, isCollection = prop.Type.getBaseType()
+    propRealType, isCollection = facts.base_type, facts.is_collection
 
     excerptPass = True
     if isCollection and prop.Value is None:
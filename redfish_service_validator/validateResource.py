@@ -5,6 +5,7 @@
 import logging
 from collections import Counter, OrderedDict
 from io import StringIO
+from itertools import chain
 
 import redfish_service_validator.traverse as traverse
 import redfish_service_validator.catalog as catalog
@@ -45,6 +46,74 @@ def get_my_capture(this_logger, handler):
     return strings
 
 
+def getLinkDestinations(redfish_obj, logentry_limit=0, log_entries=None):
+    """
+    Get the URIs of the navigation properties in a populated object, which validation and the crawl will GET
+
+    Walks the object without creating new objects or logging, so it is safe to call ahead of validation.
+    Links the crawl does not request are left out: Excerpt and AutoExpand links, and LogEntry links past logentry_limit
+
+    :param logentry_limit: number of LogEntry links to keep, 0 for all of them
+    """
+    top = log_entries is None
+    if top: log_entries = []
+    uris = []
+    for prop in redfish_obj.properties.values():
+        if not prop.Exists or not isinstance(prop.Type, catalog.RedfishType):
+            continue
+        if prop.Type.IsNav:
+            if prop.Type.AutoExpand or prop.Type.Excerpt:
+                continue
+            values = prop.Value if isinstance(prop.Value, list) else [prop.Value]
+            values = [x['@odata.id'] for x in values if isinstance(x, dict) and isinstance(x.get('@odata.id'), str)]
+            (log_entries if 'LogEntry' in prop.Type.fulltype else uris).extend(values)
+        elif isinstance(prop, catalog.RedfishObject):
+            for sub_obj in getattr(prop, 'Collection', []):
+                uris.extend(getLinkDestinations(sub_obj, logentry_limit, log_entries))
+    if not top:
+        return uris
+    return uris + (log_entries[:logentry_limit] if logentry_limit else log_entries)
+
+
+def getMembersLimit(service, redfish_obj):
+    """
+    Get the number of members of a collection that the crawl validates
+
+    :return: logentry_limit for collections of LogEntry, 0 for all members
+    """
+    members_type = redfish_obj['Members'].Type if 'Members' in redfish_obj else None
+    if isinstance(members_type, catalog.RedfishType) and 'LogEntry' in members_type.fulltype:
+        return max(int(service.config.get('logentry_limit', 15)), 0)
+    return 0
+
+
+def getPagedLinks(service, URI, redfish_obj, limit=0):
+    """
+    Get links to the members on the pages of a collection that follow its payload
+
+    Each page is requested only once the links of the previous page were used, so one page is held at a time
+
+    :param limit: number of members of the collection to stop at, 0 for all members
+    """
+    if 'Members' not in redfish_obj or not isinstance(redfish_obj.payload.get('Members'), list):
+        return
+    members_prop = redfish_obj['Members']
+    # links without a type are skipped, like those of the first page
+    if not isinstance(members_prop.Type, catalog.RedfishType):
+        return
+    num = len(redfish_obj.payload['Members'])
+    pages = service.getCollectionPages(URI, redfish_obj.payload)
+    while limit == 0 or num < limit:
+        members = next(pages, None)
+        if members is None:
+            return
+        for val in members if limit == 0 else members[:limit - num]:
+            new_link = members_prop.populate(val)
+            new_link.Name = new_link.Name + '#{}'.format(num)
+            num += 1
+            yield new_link
+
+
 def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=None, parent=None):
     # rs-assertion: 9.4.1
     # Initial startup here
@@ -122,6 +191,13 @@ def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=
 
     counts['passGet'] += 1
 
+    # Cache the members of a collection from one expanded request, when enabled
+    if expectedJson is None:
+        service.expandCollection(URI, me['payload'], getMembersLimit(service, redfish_obj))
+
+    # Fetch linked resources in parallel, they are requested in order by validation and the crawl
+    service.prefetchResourceURIs(getLinkDestinations(redfish_obj, max(int(service.config.get('logentry_limit', 15)), 0)))
+
     # verify odata_id properly resolves to its parent if holding fragment
     odata_id = me['payload'].get('@odata.id')
     if odata_id is not None and '#' in odata_id:
@@ -234,7 +310,7 @@ def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=
             counts['unverifiedAdditional'] += 1
             messages[key] = create_entry(key, displayValue(item), '-', '-', 'Additional')
 
-        fuzz = catalog.get_fuzzy_property(key, redfish_obj.properties)
+        fuzz = catalog.get_fuzzy_property(key, redfish_obj.properties, type_obj=redfish_obj.Type)
         if fuzz != key and fuzz in redfish_obj.properties:
             messages[fuzz] = create_entry(fuzz, '-', '-', '-', 'INVALID')
             my_logger.error('Attempting {} (from {})?'.format(fuzz, key))
@@ -296,10 +372,14 @@ def validateURITree(service, URI, uriName, expectedType=None, expectedJson=None,
     # If successful...
     if validateSuccess:
         # Bring Registries to Front if possible
+        logentry_limit = max(int(service.config.get('logentry_limit', 15)), 0)
         log_entries = [x for x in links if 'LogEntry' in x.Type.fulltype]
-        links = [x for x in links if 'LogEntry' not in x.Type.fulltype] + log_entries[:15] # Pare down logentries
+        links = [x for x in links if 'LogEntry' not in x.Type.fulltype] + (log_entries[:logentry_limit] if logentry_limit else log_entries) # Pare down logentries
+
+        # Members on further pages of a collection follow, limited the same way for LogEntry
+        paged_links = getPagedLinks(service, URI, thisobj, getMembersLimit(service, thisobj))
 
-        for link in sorted(links, key=lambda x: (x.Type.fulltype != 'Registries.Registries')):
+        for link in chain(sorted(links, key=lambda x: (x.Type.fulltype != 'Registries.Registries')), paged_links):
             if link is None or link.Value is None:
                 my_logger.warning('Link is None, does it exist?')
                 continue
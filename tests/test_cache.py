@@ -0,0 +1,48 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for cache.py
+#
+
+import unittest
+import sys
+import tempfile
+
+import redfish as rf
+
+sys.path.append('../')
+
+from redfish_service_validator.cache import ResponseCache
+
+def make_result(payload):
+    response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json'}, Content=payload)
+    return True, response.dict, response, 0
+
+class TestCache(unittest.TestCase):
+    def test_eviction(self):
+        my_cache = ResponseCache(30)
+        my_cache.put('/redfish/v1/A', make_result('{"Name": "A"}'))
+        my_cache.put('/redfish/v1/B', make_result('{"Name": "B"}'))
+        self.assertEqual(my_cache.get('/redfish/v1/A')[1], {'Name': 'A'})
+        # B is least recently used, and is evicted
+        my_cache.put('/redfish/v1/C', make_result('{"Name": "C"}'))
+        self.assertIsNone(my_cache.get('/redfish/v1/B'))
+        self.assertEqual(my_cache.get('/redfish/v1/C')[1], {'Name': 'C'})
+        self.assertLessEqual(my_cache.size, 30)
+        self.assertEqual(my_cache.counter['hits'], 2)
+        self.assertEqual(my_cache.counter['misses'], 1)
+        self.assertEqual(my_cache.counter['evictions'], 1)
+
+    def test_spill(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            my_cache = ResponseCache(0, spill_dir)
+            my_cache.put('/redfish/v1/A', make_result('{"Name": "A"}'))
+            self.assertEqual(len(my_cache), 0)
+            self.assertIn('/redfish/v1/A', my_cache)
+            success, decoded, response, elapsed = my_cache.get('/redfish/v1/A')
+            self.assertTrue(success)
+            self.assertEqual(decoded, {'Name': 'A'})
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.getheader('content-type'), 'application/json')
+            self.assertEqual(my_cache.counter['spillHits'], 1)
@@ -0,0 +1,32 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for cassette.py
+#
+
+import unittest
+import sys
+import tempfile
+from datetime import timedelta
+
+import redfish as rf
+
+sys.path.append('../')
+
+from redfish_service_validator.cassette import Cassette, CassetteError
+
+class TestCassette(unittest.TestCase):
+    def test_record_replay(self):
+        with tempfile.TemporaryDirectory() as cassette_dir:
+            my_cassette = Cassette(cassette_dir)
+            response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json'}, Content='{"Name": "A"}')
+            my_cassette.record('/redfish/v1/A', response, timedelta(seconds=1.5))
+
+            response, elapsed = Cassette(cassette_dir).play('/redfish/v1/A')
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.getheader('content-type'), 'application/json')
+            self.assertEqual(response.dict, {'Name': 'A'})
+            self.assertEqual(elapsed, timedelta(seconds=1.5))
+
+            self.assertRaises(CassetteError, my_cassette.play, '/redfish/v1/B')
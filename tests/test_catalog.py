@@ -7,7 +7,12 @@
 
 import unittest
 import sys
+import difflib
+import glob
+import os
 import pprint
+import shutil
+import tempfile
 
 sys.path.append('../')
 
@@ -26,6 +31,12 @@ class TestCatalog(unittest.TestCase):
         self.assertEqual(val, 'PropertyA')
         # OK
 
+        my_matcher = catalog.FuzzyMatcher(['PropertyB', 'PropertyC', 'Name', 'Status'])
+        for key in ['PropertyA', 'Stauts', 'Nmae', 'Other']:
+            for my_props in [['PropertyB', 'PropertyC', 'Name', 'Status'], ['PropertyC', 'Name'], ['Name', 'PropertyAA', 'Statuses']]:
+                self.assertEqual(my_matcher.getCloseMatches(key, my_props), difflib.get_close_matches(key, my_props, 1, 0.70))
+        self.assertIn('PropertyA', my_matcher.matches)
+
     def test_catalog(self):
         print('\n')
         my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
@@ -36,6 +47,14 @@ class TestCatalog(unittest.TestCase):
 
         my_schema = my_catalog.getSchemaInCatalog('Example.v1_0_0')
 
+        # casting picks the last namespace defining a type at or below the limiting version
+        self.assertEqual(my_schema_doc.getCastNamespace('Links', (1, 4, 9)), 'Example.v1_4_0')
+        self.assertEqual(my_schema_doc.getCastNamespace('Links', (1, 0, 0)), 'Example.v1_0_0')
+        self.assertIsNone(my_schema_doc.getCastNamespace('Links', (0, 9, 0)))
+        self.assertIsNone(my_schema_doc.getCastNamespace('NoLinks', (1, 4, 9)))
+        self.assertEqual(my_schema.getHighestType('Example.Example', 'Example.v1_1_3'), 'Example.v1_1_3.Example')
+        self.assertEqual(my_schema.getHighestType('Example.NoExample'), 'NoExample')
+
         my_type = my_catalog.getTypeInCatalog('Example.v1_7_0.Example')
 
         my_type = my_catalog.getTypeInCatalog('Example.v1_2_0.Links')
@@ -77,6 +96,9 @@ class TestCatalog(unittest.TestCase):
         print(prop.as_json())
         prop = catalog.RedfishProperty("Edm.Guid").populate(catalog.REDFISH_ABSENT)
         print(prop.as_json())
+        self.assertEqual(prop.as_json(), {'Name': 'Property', 'Type': 'Edm.Guid', 'Value': catalog.REDFISH_ABSENT, 'IsValid': True, 'SchemaExists': True, 'Exists': False})
+        self.assertFalse(hasattr(prop, '__dict__'))
+        self.assertEqual(catalog.RedfishProperty("Edm.Guid").as_json(), {'Name': 'Property', 'Type': 'Edm.Guid'})
 
     def test_basic_properties_check(self):
         print('\nTesting check values')
@@ -89,7 +111,12 @@ class TestCatalog(unittest.TestCase):
         prop = catalog.RedfishProperty("Edm.String").populate(1, check=True)
         prop = catalog.RedfishProperty("Edm.Guid").populate("123", check=True)
         prop = catalog.RedfishProperty("Edm.Guid").populate(catalog.REDFISH_ABSENT, check=True)
-    
+        self.assertTrue(catalog.RedfishProperty.validate_basic([1, 2], "Collection(Edm.Int64)", None, 0, 2))
+        self.assertRaises(ValueError, catalog.RedfishProperty.validate_basic, [1, 3], "Collection(Edm.Int64)", None, 0, 2)
+        self.assertTrue(catalog.RedfishProperty.validate_basic("ab", "Edm.String", "a|ab"))
+        self.assertRaises(ValueError, catalog.RedfishProperty.validate_basic, True, "Edm.String")
+        self.assertFalse(catalog.RedfishProperty.validate_basic(1, "Edm.Unknown"))
+
     def test_object(self):
         print('\nTesting object values')
         my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
@@ -113,6 +140,23 @@ class TestCatalog(unittest.TestCase):
         print(my_type.CanInsert)
         print(my_type.CanDelete)
     
+    def test_type_tree(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_type = my_catalog.getTypeInCatalog('Example.v1_0_0.Example')
+        my_tree = my_type.getTypeTree()
+        self.assertIs(my_tree, my_type.getTypeTree())
+        self.assertIn('Example.Example', my_tree)
+        self.assertNotIn('Example.v1_0_0.Links', my_tree)
+        self.assertEqual([str(x) for x in my_tree][:2], ['Example.v1_0_0.Example', 'Example.Example'])
+        self.assertIs(my_type.getProperties(), my_type.getProperties())
+        self.assertEqual(my_type.getBaseType(), ('entity', False))
+        self.assertEqual(my_type.getBaseType(True), ('entity', True))
+
+        my_skeleton = my_type.getSkeleton()
+        self.assertIs(my_skeleton, my_type.getSkeleton())
+        self.assertEqual([x[0] for x in my_skeleton], list(my_type.getProperties()))
+        self.assertEqual(list(catalog.RedfishObject(my_type).properties), [x[0] for x in my_skeleton])
+
     def test_expected_uris(self):
         print('\nTesting expected Uris')
         my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
@@ -147,6 +191,105 @@ class TestCatalog(unittest.TestCase):
         print(object.HasValidUri)
 
 
+    def test_annotations(self):
+        print('\nTesting annotations')
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_doc = catalog.SchemaDoc('''<?xml version="1.0" encoding="UTF-8"?>
+<edmx:Edmx xmlns:edmx="http://docs.oasis-open.org/odata/ns/edmx" Version="4.0">
+  <edmx:DataServices>
+    <Schema xmlns="http://docs.oasis-open.org/odata/ns/edm" Namespace="Annotated.v1_0_0">
+      <EntityType Name="Annotated">
+        <Annotation Term="Redfish.Uris"><Collection><String>/redfish/v1/Annotated</String></Collection></Annotation>
+        <Annotation Term="OData.Description" String="An annotated resource."/>
+        <Annotation Term="OData.AdditionalProperties" Bool="true"/>
+        <Annotation Term="Capabilities.InsertRestrictions"><Record><PropertyValue Property="Insertable" Bool="true"/></Record></Annotation>
+        <Property Name="Old" Type="Edm.String">
+          <Annotation Term="Redfish.Revisions">
+            <Collection>
+              <Record><PropertyValue Property="Kind" EnumMember="Redfish.RevisionKind/Added"/><PropertyValue Property="Version" String="v1_0_0"/></Record>
+              <Record><PropertyValue Property="Kind" EnumMember="Redfish.RevisionKind/Deprecated"/><PropertyValue Property="Description" String="Use New"/></Record>
+            </Collection>
+          </Annotation>
+        </Property>
+      </EntityType>
+    </Schema>
+  </edmx:DataServices>
+</edmx:Edmx>''', my_catalog, 'Annotated_v1.xml')
+        my_type = my_doc.classes['Annotated.v1_0_0'].my_types['Annotated']
+        self.assertEqual(my_type.annotations['Redfish.Uris'].strings, ['/redfish/v1/Annotated'])
+        self.assertNotIn('OData.Description', my_type.annotations)
+        self.assertFalse(hasattr(my_type, '__dict__'))
+        self.assertEqual(my_type.unique_properties['Old'].Revisions[1]['Description'].get('String'), 'Use New')
+
+        # facts of the type itself are plain attributes, combined over the type tree when used
+        self.assertEqual(my_type.uris, ['/redfish/v1/Annotated'])
+        self.assertEqual(my_type.capabilities, {'CanInsert': True})
+        self.assertTrue(my_type.additional)
+        self.assertEqual(my_type.getCapabilities(), {'CanUpdate': False, 'CanInsert': True, 'CanDelete': False})
+        self.assertTrue(my_type.HasAdditional)
+        self.assertEqual(my_type.getUris(), ['/redfish/v1/Annotated'])
+        self.assertIsNone(my_type.DynamicProperties)
+        self.assertFalse(my_type.unique_properties['Old'].HasAdditional)
+
+        my_facts = my_type.unique_properties['Old'].getPropertyFacts()
+        self.assertIs(my_facts, my_type.unique_properties['Old'].getPropertyFacts())
+        self.assertEqual(my_facts.base_type, 'Edm.String')
+        self.assertEqual(my_facts.deprecations, ('The given property is deprecated: Use New',))
+
+        # additional properties of an Edm type share one type, made without any schema
+        my_dynamic = my_doc.classes['Annotated.v1_0_0'].getDynamicPropertyType('Edm.String')
+        self.assertIs(my_dynamic, my_doc.classes['Annotated.v1_0_0'].getDynamicPropertyType('Edm.String'))
+        self.assertEqual(my_dynamic.fulltype, 'Edm.String')
+        self.assertTrue(my_dynamic.IsPropertyType)
+
+    def test_uri_matcher(self):
+        print('\nTesting uri matcher')
+        my_matcher = catalog.getUriMatcher(('/redfish/v1/Chassis/{ChassisId}', '/redfish/v1/Systems/{ComputerSystemId}/Chassis/{ChassisId}'))
+        self.assertIs(my_matcher, catalog.getUriMatcher(('/redfish/v1/Chassis/{ChassisId}', '/redfish/v1/Systems/{ComputerSystemId}/Chassis/{ChassisId}')))
+        self.assertTrue(my_matcher.match('/redfish/v1/Chassis/1'))
+        self.assertTrue(my_matcher.match('/redfish/v1/Systems/1/Chassis/A'))
+        self.assertFalse(my_matcher.match('/redfish/v1/Managers/1'))
+        self.assertTrue(my_matcher.matchStrict('/redfish/v1/Chassis/1', [('Chassis', '1', '1'), ('ChassisCollection', None, 'Chassis')]))
+        self.assertFalse(my_matcher.matchStrict('/redfish/v1/Chassis/1', [('Chassis', '2', '1'), ('ChassisCollection', None, 'Chassis')]))
+        self.assertFalse(my_matcher.matchStrict('/redfish/v1/Chassis/1', [('Manager', '1', '1')]))
+
+    def test_compiled_catalog(self):
+        print('\nTesting compiled catalog')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            schema_dir = os.path.join(temp_dir, 'schemas')
+            shutil.copytree('./tests/testdata/schemas/', schema_dir)
+            catalog.SchemaCatalog(schema_dir, compiled=True).getTypeInCatalog('Example.v1_0_0.Example')
+            compiled_path = catalog.getCompiledCatalogPath(schema_dir, catalog.getSchemaHash(schema_dir))
+            self.assertEqual(sorted(os.listdir(compiled_path)), ['Example_v1.xml.pickle', 'index.pickle'])
+
+            my_catalog = catalog.SchemaCatalog(schema_dir, compiled=True)
+            self.assertEqual(my_catalog.catalog, {})
+            my_type = my_catalog.getTypeInCatalog('Example.v1_0_0.Example')
+            self.assertIs(my_type.catalog, my_catalog)
+            self.assertEqual(list(my_catalog.catalog), ['Example_v1.xml'])
+            self.assertEqual(len(my_type.getUris()), 2)
+            self.assertEqual(my_type.tag_type, 'EntityType')
+            self.assertEqual(my_type.getCapabilities(), catalog.SchemaCatalog(schema_dir).getTypeInCatalog('Example.v1_0_0.Example').getCapabilities())
+
+            # changed schema files replace the compiled catalog, and catalogs of other schema directories are kept
+            sibling_path = catalog.getCompiledCatalogPath(schema_dir + '-v2', catalog.getSchemaHash(schema_dir))
+            os.makedirs(sibling_path)
+            with open(os.path.join(schema_dir, 'Example_v1.xml'), 'a') as f:
+                f.write('\n')
+            catalog.SchemaCatalog(schema_dir, compiled=True)
+            self.assertEqual(sorted(glob.glob(os.path.join(temp_dir, '*.catalog'))), [catalog.getCompiledCatalogPath(schema_dir, catalog.getSchemaHash(schema_dir)), sibling_path])
+
+            # a compiled catalog that cannot be written is warned about once
+            compiled_path = catalog.getCompiledCatalogPath(schema_dir, catalog.getSchemaHash(schema_dir))
+            shutil.rmtree(compiled_path)
+            open(compiled_path, 'w').close()
+            with self.assertLogs(catalog.my_logger, 'WARNING') as logs:
+                my_catalog = catalog.SchemaCatalog(schema_dir, compiled=True)
+                my_catalog.getTypeInCatalog('Example.v1_0_0.Example')
+                my_catalog.getTypeInCatalog('ExampleResource.v1_0_0.ExampleResource')
+            self.assertEqual(len(logs.output), 1)
+            self.assertFalse(my_catalog.compiled_writable)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
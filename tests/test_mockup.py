@@ -0,0 +1,55 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for mockup.py
+#
+
+import unittest
+import sys
+import json
+import os
+import tempfile
+import zipfile
+
+sys.path.append('../')
+
+from redfish_service_validator.mockup import MockupIndex
+
+class TestMockup(unittest.TestCase):
+    def test_mockup(self):
+        with tempfile.TemporaryDirectory() as mockup_dir:
+            resources = {'': {'Name': 'Root'}, 'Chassis/1': {'Name': 'Chassis'}}
+            for key, payload in resources.items():
+                os.makedirs(os.path.join(mockup_dir, 'mockup', key), exist_ok=True)
+                with open(os.path.join(mockup_dir, 'mockup', key, 'index.json'), 'w') as f:
+                    json.dump(payload, f)
+            with zipfile.ZipFile(os.path.join(mockup_dir, 'mockup.zip'), 'w') as zf:
+                for key in resources:
+                    zf.write(os.path.join(mockup_dir, 'mockup', key, 'index.json'), os.path.join('mockup', key, 'index.json'))
+
+            for location in [os.path.join(mockup_dir, 'mockup'), os.path.join(mockup_dir, 'mockup.zip')]:
+                my_mockup = MockupIndex(location)
+                self.assertEqual(len(my_mockup), 2)
+                self.assertIn('/redfish/v1/', my_mockup)
+                self.assertEqual(json.loads(my_mockup.get('/redfish/v1/Chassis/1')), {'Name': 'Chassis'})
+                self.assertEqual(json.loads(my_mockup.get('/redfish/v1/')), {'Name': 'Root'})
+                self.assertIsNone(my_mockup.get('/redfish/v1/Chassis/2'))
+                my_mockup.close()
+
+    def test_partial_mockup(self):
+        with tempfile.TemporaryDirectory() as mockup_dir:
+            resources = {'Chassis/1': {'@odata.id': '/redfish/v1/Chassis/1'}, 'Chassis/2': {'@odata.id': '/redfish/v1/Chassis/2'}}
+            archives = {'partial.zip': '', 'wrapped.zip': 'mockup/redfish/v1', 'dmtf.zip': 'redfish/v1'}
+            for archive, wrapper in archives.items():
+                with zipfile.ZipFile(os.path.join(mockup_dir, archive), 'w') as zf:
+                    for key, payload in resources.items():
+                        zf.writestr('/'.join(x for x in [wrapper, key, 'index.json'] if x), json.dumps(payload))
+
+            # a partial mockup is indexed from the top of the archive, as it is from a directory
+            for archive in archives:
+                my_mockup = MockupIndex(os.path.join(mockup_dir, archive))
+                self.assertEqual(len(my_mockup), 2)
+                self.assertIn('/redfish/v1/Chassis/1', my_mockup)
+                self.assertEqual(json.loads(my_mockup.get('/redfish/v1/Chassis/2')), {'@odata.id': '/redfish/v1/Chassis/2'})
+                my_mockup.close()
@@ -0,0 +1,52 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for throttle.py
+#
+
+import unittest
+import sys
+
+sys.path.append('../')
+
+from redfish_service_validator.throttle import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, getRetryDelay
+
+class TestThrottle(unittest.TestCase):
+    def test_limiter(self):
+        limiter = AdaptiveLimiter(8)
+        self.assertEqual(int(limiter.limit), 1)
+        for _ in range(100):
+            limiter.update(0.1, True)
+        self.assertEqual(limiter.limit, 8)
+
+        # server errors and latency spikes back off multiplicatively
+        limiter.update(0.1, False)
+        self.assertEqual(limiter.limit, 4)
+        limiter.update(1.0, True)
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(10):
+            limiter.update(0.1, False)
+        self.assertEqual(limiter.limit, 1)
+
+    def test_breaker(self):
+        breaker = CircuitBreaker('127.0.0.1', threshold=2, cooldown=0)
+        breaker.check()
+        self.assertFalse(breaker.failure())
+        self.assertTrue(breaker.failure())
+        self.assertFalse(breaker.failure())
+        self.assertEqual(breaker.trips, 1)
+        # after the cooldown a trial is let through, and success closes the breaker
+        breaker.check()
+        breaker.success()
+        self.assertIsNone(breaker.opened)
+
+        breaker = CircuitBreaker('127.0.0.1', threshold=1, cooldown=60)
+        breaker.failure()
+        self.assertRaises(CircuitOpenError, breaker.check)
+
+    def test_retry_delay(self):
+        for attempt in range(1, 10):
+            self.assertLessEqual(getRetryDelay(attempt), min(8.0, 0.5 * 2 ** (attempt - 1)))
+        self.assertEqual(getRetryDelay(1, '5'), 5)
+        self.assertEqual(getRetryDelay(1, '3600'), 30)
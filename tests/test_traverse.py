@@ -0,0 +1,401 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for traverse.py
+#
+
+import unittest
+import asyncio
+import sys
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import redfish as rf
+import requests
+
+sys.path.append('../')
+
+import redfish_service_validator.RedfishServiceValidator
+from redfish_service_validator import schema_pack
+from redfish_service_validator.cassette import Cassette
+from redfish_service_validator.throttle import CircuitOpenError
+from redfish_service_validator.traverse import rfService
+from redfish_service_validator.validateResource import validateURITree
+
+SCHEMA = '''<?xml version="1.0" encoding="UTF-8"?>
+<edmx:Edmx xmlns:edmx="http://docs.oasis-open.org/odata/ns/edmx" Version="4.0">
+  <edmx:DataServices>
+    <Schema xmlns="http://docs.oasis-open.org/odata/ns/edm" Namespace="{0}">
+      <EntityType Name="{0}" Abstract="true"/>
+      <EntityType Name="{0}Collection">
+        <Property Name="Name" Type="Edm.String"/>
+        <NavigationProperty Name="Members" Type="Collection({0}.{0})"/>
+      </EntityType>
+    </Schema>
+    <Schema xmlns="http://docs.oasis-open.org/odata/ns/edm" Namespace="{0}.v1_0_0">
+      <EntityType Name="{0}" BaseType="{0}.{0}">
+        <Property Name="Id" Type="Edm.String"/>
+        <Property Name="Name" Type="Edm.String"/>
+        <NavigationProperty Name="Log" Type="LogEntry.LogEntryCollection"/>
+        <NavigationProperty Name="Summary" Type="{0}.{0}">
+          <Annotation Term="Redfish.ExcerptCopy"/>
+        </NavigationProperty>
+      </EntityType>
+    </Schema>
+  </edmx:DataServices>
+</edmx:Edmx>'''
+
+
+def make_collection(uri, name, members, **kwargs):
+    payload = {'@odata.id': uri, '@odata.type': '#{0}.{0}Collection'.format(name), 'Name': name,
+               'Members': [{'@odata.id': x} for x in members], 'Members@odata.count': len(members)}
+    payload.update(kwargs)
+    return payload
+
+
+def make_resource(uri, name, **kwargs):
+    payload = {'@odata.id': uri, '@odata.type': '#{0}.v1_0_0.{0}'.format(name), 'Id': uri.rsplit('/', 1)[-1], 'Name': name}
+    payload.update(kwargs)
+    return payload
+
+
+class FakeService():
+    """
+    Schemas and a cassette of responses in a temporary directory, to run rfService against
+    """
+    def __init__(self, resources):
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, 'schemas'))
+        for name in ['Thing', 'LogEntry']:
+            with open(os.path.join(self.directory.name, 'schemas', name + '_v1.xml'), 'w') as f:
+                f.write(SCHEMA.format(name))
+        # members of an Orphan collection have no schema
+        with open(os.path.join(self.directory.name, 'schemas', 'Orphan_v1.xml'), 'w') as f:
+            f.write(SCHEMA.format('Orphan').replace('Collection(Orphan.Orphan)', 'Collection(Absent.Absent)'))
+        self.cassette = Cassette(os.path.join(self.directory.name, 'cassette'))
+        resources = dict(resources)
+        resources.setdefault('/redfish/v1', {'@odata.id': '/redfish/v1', 'RedfishVersion': '1.6.0'})
+        for uri, payload in resources.items():
+            response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json'}, Content=json.dumps(payload))
+            self.cassette.record(uri, response, 0.1)
+
+    def start(self, **kwargs):
+        config = {'ip': 'http://127.0.0.1:8000', 'username': '', 'password': '', 'forceauth': False, 'authtype': 'None', 'token': '',
+                  'ext_http_proxy': '', 'ext_https_proxy': '', 'serv_http_proxy': '', 'serv_https_proxy': '',
+                  'schema_directory': os.path.join(self.directory.name, 'schemas'), 'uricheck': False, 'mockup': '',
+                  'replay': self.cassette.directory, 'workers': 1, 'logentry_limit': 15}
+        config.update(kwargs)
+        service = rfService(config)
+        self.requests, self.prefetched = [], []
+        fetch, prefetch = service._fetchResource, service.prefetchResourceURIs
+        service._fetchResource = lambda URILink: self.requests.append(URILink) or fetch(URILink)
+        service.prefetchResourceURIs = lambda URILinks: self.prefetched.extend(URILinks) or prefetch(URILinks)
+        return service
+
+    def close(self):
+        self.directory.cleanup()
+
+
+class TestTraverse(unittest.TestCase):
+    def test_prefetch(self):
+        things = ['/redfish/v1/Things/{}'.format(x) for x in range(8)]
+        resources = {x: make_resource(x, 'Thing') for x in things}
+        resources['/redfish/v1/Things'] = make_collection('/redfish/v1/Things', 'Thing', things)
+        resources['/redfish/v1/Things/0']['Summary'] = {'@odata.id': '/redfish/v1/Things/Summary'}
+        resources['/redfish/v1/Things/0']['Log'] = {'@odata.id': '/redfish/v1/Log'}
+        entries = ['/redfish/v1/Log/{}'.format(x) for x in range(20)]
+        resources.update({x: make_resource(x, 'LogEntry') for x in entries})
+        resources['/redfish/v1/Log'] = make_collection('/redfish/v1/Log', 'LogEntry', entries)
+        fake = FakeService(resources)
+        try:
+            all_results = []
+            for workers in [1, 4]:
+                service = fake.start(workers=workers, logentry_limit=5)
+                success, counts, results, links, obj = validateURITree(service, '/redfish/v1/Things', 'Things')
+                self.assertTrue(success)
+                # finished prefetches were moved to the cache or consumed, and links the crawl skips were not prefetched
+                self.assertEqual(len(service.pending), 0)
+                self.assertNotIn('/redfish/v1/Things/Summary', fake.prefetched)
+                self.assertEqual(len([x for x in fake.prefetched if x.startswith('/redfish/v1/Log/')]), 5)
+                self.assertEqual(len(fake.requests), len(set(fake.requests)))
+                all_results.append([(x, y['uri'], y['success'], dict(y['counts'])) for x, y in results.items()])
+                service.close()
+            self.assertEqual(all_results[0], all_results[1])
+
+            # a prefetched resource is served from the cache, without another request
+            service = fake.start(workers=4)
+            service.prefetchResourceURIs(things)
+            # callbacks of finished futures may still be running
+            for _ in range(500):
+                if len(service.pending) == 0:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(len(service.pending), 0)
+            self.assertTrue(all(x in service.cache for x in things))
+            for uri in things:
+                success, data, response, elapsed = service.callResourceURI(uri)
+                self.assertEqual(data['@odata.id'], uri)
+            self.assertEqual(sorted(fake.requests), sorted(things))
+            service.close()
+        finally:
+            fake.close()
+
+    def test_prefetch_errors(self):
+        fake = FakeService({'/redfish/v1/Things/1': make_resource('/redfish/v1/Things/1', 'Thing')})
+        fake.cassette.record('/redfish/v1/Things/2', rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json'}, Content='{"Name"'), 0.1)
+        decoders = []
+        decode = rf.rest.v1.StaticRestResponse.dict.fget
+        try:
+            with mock.patch.object(rf.rest.v1.StaticRestResponse, 'dict', property(lambda x: decoders.append(threading.current_thread()) or decode(x))):
+                service = fake.start(workers=4)
+                decoders.clear()
+                service.prefetchResourceURIs(['/redfish/v1/Things/1', '/redfish/v1/Things/2'])
+                for _ in range(500):
+                    if '/redfish/v1/Things/1' in service.cache and service.pending['/redfish/v1/Things/2'].done():
+                        break
+                    time.sleep(0.01)
+                # prefetches are decoded without the redfish library, which logs decoding errors
+                self.assertIn('/redfish/v1/Things/1', service.cache)
+                self.assertEqual(decoders, [])
+                # a payload that does not decode is left to callResourceURI, which logs its error while its resource is validated
+                with self.assertLogs(level='ERROR'):
+                    success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/2')
+                self.assertFalse(success)
+                self.assertEqual(decoders, [threading.main_thread()])
+                service.close()
+        finally:
+            fake.close()
+
+    def test_async(self):
+        things = ['/redfish/v1/Things/{}'.format(x) for x in range(3)]
+        fake = FakeService({x: make_resource(x, 'Thing') for x in things})
+
+        async def call(service, URILinks):
+            return await asyncio.gather(*[service.callResourceURIAsync(x) for x in URILinks])
+
+        try:
+            for workers in [1, 4]:
+                # concurrent calls for one URI share a single request, and its result
+                service = fake.start(workers=workers)
+                results = asyncio.run(call(service, [things[0], things[0], things[1], things[0] + '#/Name']))
+                self.assertEqual(sorted(fake.requests), things[:2])
+                self.assertEqual(results[0][1]['@odata.id'], things[0])
+                self.assertIs(results[0][1], results[1][1])
+                self.assertEqual(results[3][1], 'Thing')
+                self.assertEqual(service.inflight, {})
+                # later calls are served from the cache
+                asyncio.run(call(service, [things[0], things[1]]))
+                self.assertEqual(sorted(fake.requests), things[:2])
+                service.close()
+        finally:
+            fake.close()
+
+    def test_retries(self):
+        fake = FakeService({})
+        attempts = []
+
+        def request(statuses):
+            def requestResource(URILink):
+                attempts.append(URILink)
+                status = statuses.pop(0) if statuses else None
+                if status is None:
+                    raise ConnectionError('No response from {}'.format(URILink))
+                payload = json.dumps(make_resource(URILink, 'Thing'))
+                return rf.rest.v1.StaticRestResponse(Status=status, Headers={'Content-Type': 'application/json'}, Content=payload), 0.1
+            return requestResource
+
+        try:
+            with mock.patch('redfish_service_validator.traverse.time.sleep') as sleep:
+                # a retryable status is requested again, up to retries times
+                service = fake.start(retries=2)
+                service.player = None
+                service._requestResource = request([503, 503, 200])
+                success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/1')
+                self.assertTrue(success)
+                self.assertEqual(len(attempts), 3)
+                self.assertEqual(service.get_counter()['retries'], 2)
+                self.assertEqual(sleep.call_count, 2)
+
+                # the last response is kept when every attempt returns a retryable status
+                service._requestResource = request([503, 503, 503, 200])
+                success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/2')
+                self.assertFalse(success)
+                self.assertEqual(response.status, 503)
+                self.assertEqual(len(attempts), 6)
+                self.assertEqual(service.get_counter()['retries'], 4)
+                service.close()
+
+                # requests that get no response open the breaker of their target after its threshold
+                attempts.clear()
+                service = fake.start(retries=1)
+                service.player = None
+                service._requestResource = request([])
+                for n in range(5):
+                    with self.assertLogs(level='ERROR'):
+                        success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/{}'.format(n))
+                    self.assertFalse(success)
+                self.assertEqual(len(attempts), 10)
+                self.assertEqual(service.get_counter()['retries'], 5)
+                self.assertEqual(service.get_counter()['circuitBreakerTrips'], 1)
+
+                # while it is open, requests to the target fail without being made
+                with self.assertRaises(CircuitOpenError):
+                    service._fetchResource('/redfish/v1/Things/5')
+                with self.assertLogs(level='ERROR') as logs:
+                    success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/6')
+                self.assertFalse(success)
+                self.assertIn('CircuitOpenError', '\n'.join(logs.output))
+                self.assertEqual(len(attempts), 10)
+                self.assertEqual(service.get_counter()['circuitBreakerTrips'], 1)
+                service.close()
+        finally:
+            fake.close()
+
+    def test_fragments(self):
+        thing = make_resource('/redfish/v1/Things/1', 'Thing', Fans=[{'Name': 'Fan'}])
+        fake = FakeService({'/redfish/v1/Things/1': thing})
+        try:
+            # fragments are served from the cached document, and count the fetches they saved
+            service = fake.start()
+            service.callResourceURI('/redfish/v1/Things/1')
+            success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/1#/Fans/0')
+            self.assertTrue(success)
+            self.assertEqual(data, {'Name': 'Fan'})
+            service.callResourceURI('/redfish/v1/Things/1#/Fans/0')
+            self.assertEqual(fake.requests, ['/redfish/v1/Things/1'])
+            self.assertEqual(service.get_counter()['fragmentFetchesSaved'], 1)
+
+            # a pointer that does not resolve is reported once
+            with self.assertLogs(level='ERROR') as logs:
+                for _ in range(3):
+                    success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/1#/Fans/1')
+                    self.assertFalse(success)
+            self.assertEqual(len(logs.records), 2)
+            self.assertEqual(fake.requests, ['/redfish/v1/Things/1'])
+            self.assertEqual(service.get_counter()['fragmentFetchesSaved'], 2)
+            service.close()
+        finally:
+            fake.close()
+
+    def test_replay_mockup(self):
+        fake = FakeService({'/redfish/v1/Things/1': make_resource('/redfish/v1/Things/1', 'Thing')})
+        try:
+            mockup_dir = os.path.join(fake.directory.name, 'mockup')
+            os.makedirs(os.path.join(mockup_dir, 'Things', '1'))
+            with open(os.path.join(mockup_dir, 'Things', '1', 'index.json'), 'w') as f:
+                json.dump(make_resource('/redfish/v1/Things/1', 'Thing', Name='Mocked'), f)
+            # the mockup replaces the recorded resource, as it replaces the resource of the service
+            service = fake.start(mockup=mockup_dir)
+            success, data, response, elapsed = service.callResourceURI('/redfish/v1/Things/1')
+            self.assertEqual(data['Name'], 'Mocked')
+            self.assertEqual(response.getheader('X-Redfish-Mockup'), 'true')
+            service.close()
+        finally:
+            fake.close()
+
+    def test_missing_member_schema(self):
+        things = ['/redfish/v1/Orphans/{}'.format(x) for x in range(3)]
+        resources = {'/redfish/v1/Orphans': make_collection('/redfish/v1/Orphans', 'Orphan', things, **{'Members@odata.nextLink': '/redfish/v1/Orphans?page=2'})}
+        resources['/redfish/v1/Orphans?page=2'] = make_collection('/redfish/v1/Orphans', 'Orphan', ['/redfish/v1/Orphans/3'])
+        fake = FakeService(resources)
+        try:
+            # links without a type are skipped, on the first page and on later pages
+            service = fake.start()
+            success, counts, results, links, obj = validateURITree(service, '/redfish/v1/Orphans', 'Orphans')
+            self.assertTrue(success)
+            self.assertEqual(list(results), ['Orphans'])
+            self.assertNotIn('/redfish/v1/Orphans?page=2', fake.requests)
+            service.close()
+        finally:
+            fake.close()
+
+    def test_expand(self):
+        entries = ['/redfish/v1/Log/{}'.format(x) for x in range(20)]
+        resources = {x: make_resource(x, 'LogEntry') for x in entries}
+        resources['/redfish/v1/Log'] = make_collection('/redfish/v1/Log', 'LogEntry', entries)
+        resources['/redfish/v1/Log?$expand=.($levels=1)&$top=5'] = make_collection('/redfish/v1/Log', 'LogEntry', [])
+        resources['/redfish/v1/Log?$expand=.($levels=1)&$top=5']['Members'] = [resources[x] for x in entries[:5]]
+        for top_skip in [True, False]:
+            resources['/redfish/v1'] = {'@odata.id': '/redfish/v1', 'RedfishVersion': '1.6.0',
+                                        'ProtocolFeaturesSupported': {'ExpandQuery': {'NoLinks': True, 'Levels': True}, 'TopSkipQuery': top_skip}}
+            fake = FakeService(resources)
+            try:
+                # only the members that will be validated are expanded, with $top when it is supported
+                service = fake.start(expand=True, logentry_limit=5)
+                success, counts, results, links, obj = validateURITree(service, '/redfish/v1/Log', 'Log')
+                self.assertTrue(success)
+                self.assertEqual(len(results), 6)
+                self.assertEqual('/redfish/v1/Log?$expand=.($levels=1)&$top=5' in fake.requests, top_skip)
+                self.assertEqual('/redfish/v1/Log/0' in fake.requests, not top_skip)
+                self.assertFalse(any(x.endswith('$expand=.($levels=1)') for x in fake.requests))
+                service.close()
+            finally:
+                fake.close()
+
+    def test_pages(self):
+        entries = ['/redfish/v1/Log/{}'.format(x) for x in range(12)]
+        resources = {x: make_resource(x, 'LogEntry') for x in entries}
+        resources['/redfish/v1/Log'] = make_collection('/redfish/v1/Log', 'LogEntry', entries[:4], **{'Members@odata.count': 12, 'Members@odata.nextLink': '/redfish/v1/Log?page=2'})
+        resources['/redfish/v1/Log?page=2'] = make_collection('/redfish/v1/Log', 'LogEntry', entries[4:8], **{'Members@odata.nextLink': '/redfish/v1/Log?page=3'})
+        resources['/redfish/v1/Log?page=3'] = make_collection('/redfish/v1/Log', 'LogEntry', entries[8:], **{'Members@odata.nextLink': '/redfish/v1/Log?page=2'})
+        resources['/redfish/v1/Things'] = make_collection('/redfish/v1/Things', 'Thing', entries[:4], **{'Members@odata.count': 12})
+        resources['/redfish/v1/Things?$skip=4&$top=5'] = make_collection('/redfish/v1/Things', 'Thing', entries[4:9])
+        resources['/redfish/v1/Things?$skip=9&$top=5'] = make_collection('/redfish/v1/Things', 'Thing', entries[9:])
+        resources['/redfish/v1'] = {'@odata.id': '/redfish/v1', 'RedfishVersion': '1.6.0', 'ProtocolFeaturesSupported': {'TopSkipQuery': True}}
+        fake = FakeService(resources)
+        try:
+            # pages are followed through Members@odata.nextLink, and a link back to a fetched page ends the collection
+            service = fake.start()
+            pages = list(service.getCollectionPages('/redfish/v1/Log', resources['/redfish/v1/Log']))
+            self.assertEqual(pages, [[{'@odata.id': x} for x in entries[4:8]], [{'@odata.id': x} for x in entries[8:]]])
+            self.assertEqual(fake.requests, ['/redfish/v1/Log?page=2', '/redfish/v1/Log?page=3'])
+
+            # members on every page are validated, and the LogEntry limit applies to members on later pages too
+            success, counts, results, links, obj = validateURITree(service, '/redfish/v1/Log', 'Log')
+            self.assertEqual([x['uri'] for x in results.values()], ['/redfish/v1/Log'] + entries)
+            service.close()
+            service = fake.start(logentry_limit=6)
+            success, counts, results, links, obj = validateURITree(service, '/redfish/v1/Log', 'Log')
+            self.assertEqual([x['uri'] for x in results.values()], ['/redfish/v1/Log'] + entries[:6])
+            self.assertNotIn('/redfish/v1/Log?page=3', fake.requests)
+            service.close()
+
+            # without a nextLink, members up to Members@odata.count are requested with $skip and $top
+            service = fake.start(page_size=5)
+            pages = list(service.getCollectionPages('/redfish/v1/Things', resources['/redfish/v1/Things']))
+            self.assertEqual(sum(pages, []), [{'@odata.id': x} for x in entries[4:]])
+            self.assertEqual(fake.requests, ['/redfish/v1/Things?$skip=4&$top=5', '/redfish/v1/Things?$skip=9&$top=5'])
+            service.close()
+        finally:
+            fake.close()
+
+    def test_ext_proxies(self):
+        sent = []
+
+        def send(adapter, request, **kwargs):
+            sent.append((request.url, kwargs['proxies']))
+            response = requests.Response()
+            response.status_code, response._content, response.url, response.request = 404, b'', request.url, request
+            return response
+
+        fake = FakeService({})
+        try:
+            # configured proxies reach the adapter even when the environment sets its own
+            with mock.patch.dict(os.environ, {'HTTP_PROXY': 'http://env-proxy:1', 'HTTPS_PROXY': 'http://env-proxy:1'}), \
+                    mock.patch.object(requests.adapters.HTTPAdapter, 'send', send):
+                service = fake.start(ext_http_proxy='http://configured:2')
+                response, elapsed = service._requestResource('http://example.com/Thing_v1.xml')
+                service.close()
+                schema_pack.setup_schema_pack('http://example.com/pack.zip', os.path.join(fake.directory.name, 'pack'), https_proxy='http://configured:3')
+            self.assertEqual(response.status, 404)
+            self.assertEqual(sent[0][0], 'http://example.com/Thing_v1.xml')
+            self.assertEqual(sent[0][1]['http'], 'http://configured:2')
+            self.assertEqual(sent[1][0], 'http://example.com/pack.zip')
+            self.assertEqual(sent[1][1]['https'], 'http://configured:3')
+        finally:
+            fake.close()